@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 import sys
 import os
@@ -7,8 +10,10 @@ import json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from backend.config import settings
-from backend.routes import predict, feedback, retrain
-from backend.storage import init_db
+from backend.routes import predict, feedback, retrain, models
+from backend.storage import init_db, close_db
+
+APP_IMPORT_S = time.perf_counter() - _import_started
 
 
 app = FastAPI(
@@ -43,6 +48,11 @@ def startup_event():
     except Exception as e:
         print(f"⚠ Database initialization warning: {e}")
     
+    print(f"✓ Application imported in {APP_IMPORT_S:.2f}s")
+    if predict.adapter is not None and not predict.adapter.is_ready():
+        predict.adapter.start_background_load()
+        print("ℹ Loading models in the background; /ready reports progress")
+    
     print("=" * 60)
     print(f"Server running at http://{settings.HOST}:{settings.PORT}")
     print(f"API docs available at http://{settings.HOST}:{settings.PORT}/docs")
@@ -53,12 +63,19 @@ def startup_event():
 def shutdown_event():
     
     print("CalcBERT Backend shutting down...")
+    predict.compute_executor.shutdown(wait=False)
+    retrain.job_manager.shutdown()
+    # Commit queued feedback before the connections go away
+    if feedback.feedback_queue.drain(timeout=settings.FEEDBACK_DRAIN_TIMEOUT_S):
+        print("✓ Feedback queue drained")
+    close_db()
 
 
 
 app.include_router(predict.router, prefix="", tags=["Prediction"])
 app.include_router(feedback.router, prefix="", tags=["Feedback"])
 app.include_router(retrain.router, prefix="", tags=["Retrain"])
+app.include_router(models.router, prefix="", tags=["Models"])
 
 
 @app.get("/", tags=["Root"])
@@ -70,9 +87,12 @@ def root():
         "description": settings.API_DESCRIPTION,
         "endpoints": {
             "predict": "/predict",
+            "predict_batch": "/predict/batch",
             "feedback": "/feedback",
             "retrain": "/retrain",
+            "models": "/models/tfidf/versions",
             "health": "/health",
+            "ready": "/ready",
             "metrics": "/metrics",
             "docs": "/docs"
         }
@@ -89,6 +109,22 @@ def health():
     }
 
 
+@app.get("/ready", tags=["System"])
+def ready(response: Response):
+    
+    # Readiness, unlike /health, waits for the models a prediction needs
+    if predict.adapter is None:
+        response.status_code = 503
+        return {"ready": False, "models": {}, "load_timings_s": {}, "app_import_s": round(APP_IMPORT_S, 3)}
+    
+    readiness = predict.adapter.get_readiness()
+    if not readiness["ready"]:
+        response.status_code = 503
+        response.headers["Retry-After"] = str(settings.PREDICT_RETRY_AFTER_S)
+    readiness["app_import_s"] = round(APP_IMPORT_S, 3)
+    return readiness
+
+
 @app.get("/metrics", tags=["System"])
 def metrics():
     
@@ -0,0 +1,84 @@
+import os
+import threading
+from typing import Any, Callable, Generic, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return round(ordered[idx], 3)
+
+
+class ProcessLocal(Generic[T]):
+
+
+    def __init__(
+        self,
+        factory: Callable[[], T],
+        is_alive: Optional[Callable[[T], bool]] = None,
+        on_fork: Optional[Callable[[], None]] = None
+    ):
+
+        # Created on first get() and again in each forked worker: a fork copies
+        # the parent's objects but none of its threads, so an inherited pool
+        # or thread would never run anything. is_alive also recreates a dead
+        # value; on_fork resets state the child must not inherit (queues,
+        # connections).
+        self._factory = factory
+        self._is_alive = is_alive
+        self._on_fork = on_fork
+        self._value: Optional[T] = None
+        self._owner_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _usable(self, pid: int) -> bool:
+
+        value = self._value
+        return (
+            value is not None and self._owner_pid == pid
+            and (self._is_alive is None or self._is_alive(value))
+        )
+
+    def get(self) -> T:
+
+        pid = os.getpid()
+        if self._usable(pid):
+            return self._value
+        with self._lock:
+            if self._usable(pid):
+                return self._value
+            if self._owner_pid is not None and self._owner_pid != pid and self._on_fork is not None:
+                self._on_fork()
+            self._value = self._factory()
+            self._owner_pid = pid
+            return self._value
+
+    def peek(self) -> Optional[T]:
+
+        # The current value if this process created it, without creating one
+        return self._value if self._owner_pid == os.getpid() else None
+
+    def clear(self) -> Optional[T]:
+
+        with self._lock:
+            value = self.peek()
+            self._value = None
+            self._owner_pid = None
+            return value
+
+
+def lazy_thread(target: Callable[[], Any], name: str, on_fork: Optional[Callable[[], None]] = None) -> ProcessLocal[threading.Thread]:
+
+    # A daemon thread that is started on first use and restarted if it died
+    def start() -> threading.Thread:
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        return thread
+
+    return ProcessLocal(start, is_alive=lambda thread: thread.is_alive(), on_fork=on_fork)
@@ -9,9 +9,23 @@ class Settings(BaseSettings):
     LOCAL_ONLY: bool = True
     HOST: str = "127.0.0.1"
     PORT: int = 8000
+    WORKERS: int = 0
+    TORCH_THREADS_PER_WORKER: int = 1
     
     
     DB_URL: str = "sqlite+aiosqlite:///./backend/backend_feedback.db"
+    DB_POOL_SIZE: int = 4
+    DB_BUSY_TIMEOUT_S: float = 5.0
+    DB_SYNCHRONOUS: str = "NORMAL"
+    DB_CACHE_SIZE_KB: int = 16384
+    FEEDBACK_WRITE_BEHIND: bool = True
+    FEEDBACK_QUEUE_MAX_SIZE: int = 10000
+    FEEDBACK_FLUSH_BATCH_SIZE: int = 500
+    FEEDBACK_FLUSH_INTERVAL_MS: float = 50.0
+    FEEDBACK_DRAIN_TIMEOUT_S: float = 10.0
+    FEEDBACK_RETRY_AFTER_S: int = 1
+    FEEDBACK_BULK_CHUNK_SIZE: int = 5000
+    FEEDBACK_BULK_MAX_ROWS: int = 1000000
     
     
     ALLOWED_ORIGINS: List[str] = ["http://localhost:8501", "http://127.0.0.1:8501"]
@@ -19,9 +33,52 @@ class Settings(BaseSettings):
     
     TFIDF_MODEL_DIR: str = "./saved_models/tfidf"
     DISTILBERT_DIR: str = "./saved_models/distilbert"
+    DISTILBERT_BACKEND: str = "torch"
+    DISTILBERT_BUCKET_BY_LENGTH: bool = True
+    DISTILBERT_BUCKET_BATCH_SIZE: int = 32
     
     
-    RETRAIN_SYNC: bool = True 
+    BACKGROUND_MODEL_LOAD: bool = True
+    DISTILBERT_LAZY_LOAD: bool = False
+    WARMUP_ENABLED: bool = True
+    WARMUP_BATCH_SIZES: List[int] = [1, 8, 32]
+    WARMUP_ROUNDS: int = 2
+    
+    
+    PREDICT_BATCH_MAX_SIZE: int = 50000
+    PREDICT_WORKERS: int = 8
+    PREDICT_MAX_IN_FLIGHT: int = 64
+    PREDICT_RETRY_AFTER_S: int = 1
+    LAZY_CASCADE: bool = True
+    
+    
+    PREDICT_CACHE_SIZE: int = 50000
+    PREDICT_CACHE_TTL_S: float = 3600.0
+    
+    
+    DISTILBERT_MICROBATCH: bool = True
+    DISTILBERT_BATCH_WINDOW_MS: float = 3.0
+    DISTILBERT_MAX_BATCH_SIZE: int = 32
+    
+    
+    RETRAIN_SYNC: bool = False
+    RETRAIN_JOB_HISTORY: int = 50
+    RETRAIN_OUT_OF_PROCESS: bool = True
+    RETRAIN_NICE: int = 10
+    RETRAIN_CPU_LIMIT: int = 1
+    CORPUS_CACHE_ENABLED: bool = True
+    CORPUS_CACHE_DIR: str = "./data/cache"
+    FEEDBACK_AGGREGATE: bool = True
+    FEEDBACK_MIN_VOTES: int = 1
+    FEEDBACK_MAX_WEIGHT: float = 5.0
+    FEEDBACK_COMPACT_AFTER_DAYS: float = 30.0
+    TFIDF_HASHING: bool = False
+    TFIDF_HASH_FEATURES: int = 262144
+    INCREMENTAL_BATCH_SIZE: int = 256
+    INCREMENTAL_EPOCHS: int = 5
+    INCREMENTAL_MAX_SAMPLES: int = 50000
+    MODEL_CHECK_INTERVAL_S: float = 5.0
+    MODEL_REGISTRY_KEEP: int = 10
     
     
     API_TITLE: str = "CalcBERT Backend"
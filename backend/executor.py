@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.concurrency import ProcessLocal, percentile
+
+
+class ExecutorSaturated(Exception):
+
+    def __init__(self, in_flight: int, limit: int, retry_after_s: int):
+
+        super().__init__(f"Prediction capacity exhausted ({in_flight}/{limit} requests in flight)")
+        self.in_flight = in_flight
+        self.limit = limit
+        self.retry_after_s = retry_after_s
+
+
+class ComputeExecutor:
+
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_in_flight: int = 64,
+        retry_after_s: int = 1,
+        name: str = "predict",
+        stats_window: int = 2048
+    ):
+
+        self.max_workers = max(1, max_workers)
+        self.max_in_flight = max(1, max_in_flight)
+        self.retry_after_s = retry_after_s
+        self.name = name
+        self._pool: ProcessLocal[ThreadPoolExecutor] = ProcessLocal(
+            lambda: ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-compute")
+        )
+        self._lock = threading.Lock()
+
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._queue_wait_ms = deque(maxlen=stats_window)
+        self._compute_ms = deque(maxlen=stats_window)
+
+    def _admit(self) -> None:
+
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self._rejected += 1
+                raise ExecutorSaturated(self._in_flight, self.max_in_flight, self.retry_after_s)
+            self._in_flight += 1
+
+    def _release(self) -> None:
+
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Tuple[Any, Dict[str, float]]:
+
+        self._admit()
+        submitted = time.perf_counter()
+
+        def task() -> Tuple[Any, float, float]:
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started, time.perf_counter()
+
+        # The slot is released when the pool thread finishes, not when the
+        # awaiter does: a cancelled request's computation still holds a thread
+        try:
+            future = self._pool.get().submit(task)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            result, started, finished = await asyncio.wrap_future(future)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+
+        timing = {
+            "queue_ms": (started - submitted) * 1000,
+            "compute_ms": (finished - started) * 1000
+        }
+        with self._lock:
+            self._completed += 1
+            self._queue_wait_ms.append(timing["queue_ms"])
+            self._compute_ms.append(timing["compute_ms"])
+        return result, timing
+
+    def shutdown(self, wait: bool = True) -> None:
+
+        pool = self._pool.clear()
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            queue_wait = list(self._queue_wait_ms)
+            compute = list(self._compute_ms)
+            stats = {
+                "workers": self.max_workers,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "failed": self._failed
+            }
+
+        stats["queue_wait_ms"] = {
+            "p50": percentile(queue_wait, 50),
+            "p99": percentile(queue_wait, 99)
+        }
+        stats["compute_ms"] = {
+            "p50": percentile(compute, 50),
+            "p99": percentile(compute, 99)
+        }
+        return stats
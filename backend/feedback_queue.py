@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import queue
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.concurrency import lazy_thread, percentile
+
+
+FeedbackRow = Tuple[str, str, Optional[str]]
+
+_STOP = object()
+
+
+class FeedbackQueueFull(Exception):
+
+    def __init__(self, depth: int, limit: int, retry_after_s: int):
+
+        super().__init__(f"Feedback queue full ({depth}/{limit} pending writes)")
+        self.depth = depth
+        self.limit = limit
+        self.retry_after_s = retry_after_s
+
+
+class FeedbackWriteQueue:
+
+
+    def __init__(
+        self,
+        write_fn: Callable[[List[FeedbackRow]], List[int]],
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_ms: float = 50.0,
+        retry_after_s: int = 1,
+        stats_window: int = 2048
+    ):
+
+        self.write_fn = write_fn
+        self.max_size = max(1, max_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval_ms) / 1000.0
+        self.retry_after_s = retry_after_s
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.max_size)
+        # A forked child also starts from an empty queue (see ProcessLocal)
+        self._writer = lazy_thread(self._run, "feedback-writer", on_fork=self._reset_after_fork)
+        self._closed = False
+
+        # Rows accepted but not yet committed (or given up on); drain() and
+        # wait_flushed() wait for this to reach zero
+        self._idle = threading.Condition()
+        self._pending = 0
+
+        self._stats_lock = threading.Lock()
+        self._enqueued = 0
+        self._written = 0
+        self._rejected = 0
+        self._failed = 0
+        self._flushes = 0
+        self._max_batch_seen = 0
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._flush_ms = deque(maxlen=stats_window)
+        self._lag_ms = deque(maxlen=stats_window)
+
+    def _reset_after_fork(self) -> None:
+
+        self._queue = queue.Queue(maxsize=self.max_size)
+        with self._idle:
+            self._pending = 0
+
+    def enqueue(self, text: str, correct_label: str, user_id: Optional[str] = None) -> None:
+
+        if self._closed:
+            raise RuntimeError("Feedback queue is shut down")
+        self._writer.get()
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(((text, correct_label, user_id), time.perf_counter()))
+        except queue.Full:
+            self._done(1)
+            with self._stats_lock:
+                self._rejected += 1
+            raise FeedbackQueueFull(self._queue.qsize(), self.max_size, self.retry_after_s)
+        with self._stats_lock:
+            self._enqueued += 1
+
+    def _done(self, n: int) -> None:
+
+        with self._idle:
+            self._pending -= n
+            if self._pending <= 0:
+                self._idle.notify_all()
+
+    def _collect(self) -> Tuple[List[Tuple[FeedbackRow, float]], bool]:
+
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get_nowait() if remaining <= 0 else self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch: List[Tuple[FeedbackRow, float]]) -> None:
+
+        rows = [row for row, _ in batch]
+        started = time.perf_counter()
+        for attempt in range(3):
+            try:
+                self.write_fn(rows)
+                break
+            except Exception as e:
+                if attempt == 2:
+                    print(f"⚠ Dropping {len(rows)} feedback rows after 3 failed writes: {e}")
+                    with self._stats_lock:
+                        self._failed += len(rows)
+                    return
+                # Usually a locked database; back off and retry the whole batch
+                time.sleep(0.05 * (attempt + 1))
+        finished = time.perf_counter()
+
+        with self._stats_lock:
+            self._written += len(rows)
+            self._flushes += 1
+            self._max_batch_seen = max(self._max_batch_seen, len(rows))
+            self._batch_sizes.append(len(rows))
+            self._flush_ms.append((finished - started) * 1000)
+            for _, enqueued in batch:
+                self._lag_ms.append((finished - enqueued) * 1000)
+
+    def _run(self) -> None:
+
+        while True:
+            batch, stop = self._collect()
+            if batch:
+                try:
+                    self._write(batch)
+                finally:
+                    self._done(len(batch))
+            if stop:
+                return
+
+    def wait_flushed(self, timeout: Optional[float] = None) -> bool:
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def drain(self, timeout: float = 10.0) -> bool:
+
+        # Stop accepting, flush what is queued, then stop the writer
+        self._closed = True
+        thread = self._writer.peek()
+        if thread is None or not thread.is_alive():
+            return True
+        flushed = self.wait_flushed(timeout)
+        try:
+            self._queue.put(_STOP, timeout=1.0)
+        except queue.Full:
+            pass
+        thread.join(timeout=1.0)
+        if not flushed:
+            print(f"⚠ Feedback queue drain timed out with {self._pending} rows unwritten")
+        return flushed
+
+    def get_stats(self) -> Dict[str, Any]:
+
+        with self._stats_lock:
+            batch_sizes = list(self._batch_sizes)
+            flush_ms = list(self._flush_ms)
+            lag_ms = list(self._lag_ms)
+            stats = {
+                "max_size": self.max_size,
+                "queue_depth": self._queue.qsize(),
+                "pending": self._pending,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "rejected": self._rejected,
+                "failed": self._failed,
+                "flushes": self._flushes
+            }
+
+        stats["batch_size"] = {
+            "mean": round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else None,
+            "max": self._max_batch_seen
+        }
+        stats["flush_ms"] = {
+            "p50": percentile(flush_ms, 50),
+            "p99": percentile(flush_ms, 99)
+        }
+        # Time from enqueue (the HTTP ack) to commit
+        stats["commit_lag_ms"] = {
+            "p50": percentile(lag_ms, 50),
+            "p99": percentile(lag_ms, 99)
+        }
+        return stats
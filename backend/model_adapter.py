@@ -1,119 +1,706 @@
 import os
 import sys
-from typing import Dict, Any, Optional
+import json
+import time
+import queue
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List, NamedTuple, Optional
 
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from backend.config import settings
+from backend.concurrency import lazy_thread, percentile
+
+
+class MicroBatcher:
+    
+    
+    def __init__(
+        self,
+        predict_fn: Callable[[List[str]], List[Dict[str, Any]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 3.0,
+        stats_window: int = 2048
+    ):
+        
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = lazy_thread(self._run, "distilbert-microbatcher", on_fork=self._reset_after_fork)
+        
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._max_batch_seen = 0
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._wait_ms = deque(maxlen=stats_window)
+        self._compute_ms = deque(maxlen=stats_window)
+    
+    def _reset_after_fork(self) -> None:
+        
+        self._queue = queue.Queue()
+    
+    def submit(self, text: str) -> Dict[str, Any]:
+        
+        self._worker.get()
+        fut: Future = Future()
+        self._queue.put((text, fut, time.perf_counter()))
+        return fut.result()
+    
+    def _collect(self) -> List[tuple]:
+        
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self) -> None:
+        
+        while True:
+            batch = self._collect()
+            texts = [text for text, _, _ in batch]
+            started = time.perf_counter()
+            try:
+                outputs = self.predict_fn(texts)
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"Batch predictor returned {len(outputs)} results for {len(batch)} inputs")
+                for (_, fut, _), out in zip(batch, outputs):
+                    fut.set_result(out)
+            except Exception as e:
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            finished = time.perf_counter()
+            
+            with self._stats_lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._max_batch_seen = max(self._max_batch_seen, len(batch))
+                self._batch_sizes.append(len(batch))
+                self._compute_ms.append((finished - started) * 1000)
+                for _, _, enqueued in batch:
+                    self._wait_ms.append((started - enqueued) * 1000)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        
+        with self._stats_lock:
+            batch_sizes = list(self._batch_sizes)
+            wait_ms = list(self._wait_ms)
+            compute_ms = list(self._compute_ms)
+            requests, batches, max_batch = self._requests, self._batches, self._max_batch_seen
+        
+        return {
+            "window_ms": self.max_wait * 1000,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self._queue.qsize(),
+            "requests": requests,
+            "batches": batches,
+            "batch_size": {
+                "mean": round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else None,
+                "max": max_batch
+            },
+            "wait_ms": {
+                "p50": percentile(wait_ms, 50),
+                "p99": percentile(wait_ms, 99),
+                "max": round(max(wait_ms), 3) if wait_ms else None
+            },
+            "compute_ms": {
+                "p50": percentile(compute_ms, 50),
+                "p99": percentile(compute_ms, 99)
+            }
+        }
+
+
+class PredictionCache:
+    
+    
+    def __init__(self, max_size: int = 50000, ttl_s: float = 3600.0):
+        
+        self.max_size = max(1, max_size)
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._inflight: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def _lookup(self, key: Any, generation: Any, now: float) -> Optional[Dict[str, Any]]:
+        
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, entry_generation, expires_at = entry
+        if entry_generation != generation:
+            del self._entries[key]
+            self.invalidations += 1
+            return None
+        if self.ttl_s and now >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def _store(self, key: Any, value: Dict[str, Any], generation: Any, now: float) -> None:
+        
+        self._entries[key] = (value, generation, now + self.ttl_s)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def get_many(
+        self,
+        keys: List[Any],
+        generation: Any,
+        compute: Callable[[List[Any]], List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        owned: Dict[Any, List[int]] = {}
+        waiting: Dict[Any, tuple] = {}
+        
+        with self._lock:
+            now = time.monotonic()
+            for i, key in enumerate(keys):
+                if key in owned:
+                    owned[key].append(i)
+                    continue
+                if key in waiting:
+                    waiting[key][1].append(i)
+                    continue
+                value = self._lookup(key, generation, now)
+                if value is not None:
+                    self.hits += 1
+                    results[i] = value
+                    continue
+                fut = self._inflight.get(key)
+                if fut is not None:
+                    # Someone else is already computing this key; share their result
+                    self.coalesced += 1
+                    waiting[key] = (fut, [i])
+                    continue
+                self.misses += 1
+                self._inflight[key] = Future()
+                owned[key] = [i]
+        
+        if owned:
+            owned_keys = list(owned.keys())
+            try:
+                values = compute(owned_keys)
+            except Exception as e:
+                with self._lock:
+                    futures = [self._inflight.pop(key) for key in owned_keys]
+                for fut in futures:
+                    fut.set_exception(e)
+                raise
+            
+            with self._lock:
+                now = time.monotonic()
+                futures = []
+                for key, value in zip(owned_keys, values):
+                    self._store(key, value, generation, now)
+                    futures.append(self._inflight.pop(key))
+            for key, value, fut in zip(owned_keys, values, futures):
+                fut.set_result(value)
+                for i in owned[key]:
+                    results[i] = value
+        
+        for fut, indices in waiting.values():
+            value = fut.result()
+            for i in indices:
+                results[i] = value
+        
+        return results
+    
+    def clear(self) -> None:
+        
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "inflight": len(self._inflight),
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None
+            }
+
+
+# Representative raw transaction strings (mixed case, ids, punctuation,
+# short and long) used to exercise every model path before serving traffic
+WARMUP_TEXTS = (
+    "STARBCKS #1023 MUMBAI 12:32PM",
+    "UBER TRIP HELP.UBER.COM",
+    "AMAZON MKTPLACE PMTS AMZN.COM/BILL WA",
+    "NETFLIX.COM 866-579-7172 CA",
+    "SWIGGY ORDER 88231 BANGALORE",
+    "SHELL OIL 57442 FUEL",
+    "POS 4411 DMART HYDERABAD GROCERY",
+    "APOLLO PHARMACY CHENNAI",
+    "IRCTC E-TICKET PNR 4521879632 NEW DELHI TO MUMBAI CENTRAL 3A",
+    "ATM WDL",
+    "ELECTRICITY BILL PAYMENT BESCOM ACCOUNT 0043 AUTOPAY",
+    "TRANSFER TO J SMITH REF 0099812",
+)
+
+
+class ModelSnapshot(NamedTuple):
+    
+    # Everything a prediction reads from a swappable model. Requests take one
+    # reference at the start and use it throughout, so a swap (one attribute
+    # assignment) never mixes models inside a request and needs no lock.
+    tfidf: Any
+    tfidf_version: Optional[str]
+    generation: int
 
 
 class ModelAdapter:
    
     
-    def __init__(self):
+    def __init__(self, load_models: bool = True):
         
-        self.tfidf = None
+        self._snapshot = ModelSnapshot(tfidf=None, tfidf_version=None, generation=0)
         self.distil = None
         self.rules = None
         self.fusion = None
-        self._load_models()
+        self.distil_batcher = None
+        self.normalizer = None
+        self._registry_signature = None
+        # Every read-modify-write of _snapshot holds this; reentrant because
+        # reload_tfidf_model swaps while holding it
+        self._swap_lock = threading.RLock()
+        self._watcher = lazy_thread(self._watch_registry, "model-watcher")
+        self.cache = PredictionCache(
+            max_size=settings.PREDICT_CACHE_SIZE,
+            ttl_s=settings.PREDICT_CACHE_TTL_S
+        ) if settings.PREDICT_CACHE_SIZE > 0 else None
+        
+        # Per-model load state (pending/loading/loaded/missing/failed/deferred)
+        # and wall time, for the readiness probe and the startup report
+        self.model_state: Dict[str, str] = {
+            name: "pending" for name in ("normalizer", "rules", "fusion", "tfidf", "distilbert")
+        }
+        self.load_timings: Dict[str, float] = {}
+        # stage -> batch size -> {"cold_ms", "warm_ms"}
+        self.warmup_timings: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._ready = threading.Event()
+        self._load_lock = threading.Lock()
+        self._distil_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        
+        if load_models:
+            self.load_models()
+    
+    def load_models(self, warm_distil: bool = True) -> None:
+        
+        # warm_distil=False loads DistilBERT without running it; a pre-fork
+        # master uses it so no torch thread pool exists before the fork, and
+        # each worker calls warm_up_distil() after it
+        with self._load_lock:
+            if self._ready.is_set():
+                return
+            self._load_models(warm_distil)
+    
+    def start_background_load(self) -> None:
+        
+        if self._ready.is_set() or (self._loader is not None and self._loader.is_alive()):
+            return
+        self._loader = threading.Thread(target=self.load_models, name="model-loader", daemon=True)
+        self._loader.start()
+    
+    def is_ready(self) -> bool:
+        
+        return self._ready.is_set()
+    
+    def get_readiness(self) -> Dict[str, Any]:
+        
+        return {
+            "ready": self.is_ready(),
+            "models": dict(self.model_state),
+            "model_versions": self.get_model_versions(),
+            "load_timings_s": {k: round(v, 3) for k, v in self.load_timings.items()},
+            "warmup_ms": dict(self.warmup_timings)
+        }
+    
+    def _timed_load(self, name: str, loader: Callable[[], str]) -> None:
+        
+        self.model_state[name] = "loading"
+        started = time.perf_counter()
+        try:
+            self.model_state[name] = loader()
+        except Exception as e:
+            self.model_state[name] = "failed"
+            print(f"⚠ {name} load failed: {e}")
+        self.load_timings[name] = time.perf_counter() - started
+    
+    def _warm_up(self, stage: str, fn: Callable[[List[str]], Any]) -> None:
+        
+        if not settings.WARMUP_ENABLED:
+            return
+        timings: Dict[str, Dict[str, float]] = {}
+        started = time.perf_counter()
+        try:
+            for size in settings.WARMUP_BATCH_SIZES:
+                texts = [WARMUP_TEXTS[i % len(WARMUP_TEXTS)] for i in range(max(1, size))]
+                if stage != "normalizer" and self.normalizer is not None:
+                    texts = self._normalize(texts)
+                runs = []
+                for _ in range(max(2, settings.WARMUP_ROUNDS)):
+                    t0 = time.perf_counter()
+                    fn(texts)
+                    runs.append((time.perf_counter() - t0) * 1000)
+                # First call is the cold one; the last shows steady state
+                timings[str(size)] = {"cold_ms": round(runs[0], 3), "warm_ms": round(runs[-1], 3)}
+        except Exception as e:
+            print(f"⚠ {stage} warm-up failed: {e}")
+        self.warmup_timings[stage] = timings
+        print(f"✓ {stage} warmed up in {time.perf_counter() - started:.2f}s")
+    
+    def _load_models(self, warm_distil: bool = True) -> None:
+        
+        # Cheap pieces first so rules-only traffic works as early as possible
+        self._timed_load("normalizer", self._load_normalizer)
+        self._timed_load("rules", self._load_rules)
+        self._timed_load("fusion", self._load_fusion)
+        self._timed_load("tfidf", self._load_tfidf)
+        self._bump_generation()
+        
+        # Readiness waits for the warm-up so the first real requests don't pay
+        # for regex compilation, lazy allocations and first-call overhead
+        if self.normalizer is not None:
+            self._warm_up("normalizer", lambda texts: [self.normalizer.normalize_text(t) for t in texts])
+        if self.rules is not None:
+            self._warm_up("rules", lambda texts: self.rules.apply_rules_batch(texts, [None] * len(texts)))
+        if self.tfidf is not None:
+            self._warm_up("tfidf", self.tfidf.predict)
+        
+        # Readiness includes a loaded and warmed DistilBERT. The one exemption is
+        # DISTILBERT_LAZY_LOAD: torch is not even imported until a request needs it
+        if settings.DISTILBERT_LAZY_LOAD:
+            self.model_state["distilbert"] = "deferred"
+        else:
+            self._ensure_distil(warm_distil)
+        self._ready.set()
+    
+    def _load_normalizer(self) -> str:
+        
+        try:
+            import ml.data_pipeline as data_pipeline
+            data_pipeline.get_map_version()
+            self.normalizer = data_pipeline
+            print("✓ Text normalizer loaded")
+            return "loaded"
+        except Exception as e:
+            self.normalizer = None
+            print(f"⚠ Text normalizer load failed (raw text will be used): {e}")
+            return "failed"
+    
+    def _load_rules(self) -> str:
+        
+        try:
+            import ml.rules as rules
+            rules.get_engine()
+            self.rules = rules
+            print("✓ Rules module loaded")
+            return "loaded"
+        except Exception as e:
+            self.rules = None
+            print(f"⚠ Rules module load failed: {e}")
+            return "failed"
+    
+    def _load_fusion(self) -> str:
+        
+        try:
+            import ml.fusion as fusion
+            self.fusion = fusion
+            print("✓ Fusion module loaded")
+            return "loaded"
+        except Exception as e:
+            self.fusion = None
+            print(f"ℹ Fusion module not available (will use fallback): {e}")
+            return "failed"
     
-    def _load_models(self) -> None:
+    def _load_tfidf(self) -> str:
         
         tfidf_path = settings.TFIDF_MODEL_DIR
         try:
             from ml.tfidf_pipeline import TfidfPipeline
+            from ml.model_registry import ModelRegistry
             p = TfidfPipeline()
             if os.path.exists(tfidf_path):
+                self._registry_signature = ModelRegistry(tfidf_path).pointer_signature()
                 p.load(tfidf_path)
-                self.tfidf = p
-                print(f"✓ TF-IDF model loaded from {tfidf_path}")
+                with self._swap_lock:
+                    self._snapshot = self._snapshot._replace(tfidf=p, tfidf_version=p.version)
+                print(f"✓ TF-IDF model {p.version} loaded from {tfidf_path}")
+                return "loaded"
             else:
                 print(f"⚠ TF-IDF model directory not found: {tfidf_path}")
+                return "missing"
         except Exception as e:
-            self.tfidf = None
+            with self._swap_lock:
+                self._snapshot = self._snapshot._replace(tfidf=None, tfidf_version=None)
             print(f"⚠ TF-IDF load failed: {e}")
+            return "failed"
+    
+    def _ensure_distil(self, warm: bool = True) -> None:
         
+        if self.model_state["distilbert"] not in ("pending", "deferred"):
+            return
+        with self._distil_lock:
+            if self.model_state["distilbert"] not in ("pending", "deferred"):
+                return
+            self._timed_load("distilbert", lambda: self._load_distilbert(warm))
+            if self.distil is not None:
+                self._bump_generation()
+    
+    def _load_distilbert(self, warm: bool = True) -> str:
         
         dist_path = settings.DISTILBERT_DIR
+        # Checking for the model files first avoids importing torch and
+        # transformers (seconds) when there is nothing to load
+        if not os.path.exists(os.path.join(dist_path, "config.json")):
+            print(f"ℹ DistilBERT model not found (optional): {dist_path}")
+            return "missing"
         try:
             from ml.distilbert_model import DistilBertWrapper
-            if os.path.exists(dist_path):
-                d = DistilBertWrapper(dist_path)
-                d.load(dist_path)
-                self.distil = d
-                print(f"✓ DistilBERT model loaded from {dist_path}")
-            else:
-                print(f"ℹ DistilBERT model directory not found (optional): {dist_path}")
+            d = DistilBertWrapper(
+                dist_path,
+                backend=settings.DISTILBERT_BACKEND,
+                bucket_by_length=settings.DISTILBERT_BUCKET_BY_LENGTH,
+                batch_size=settings.DISTILBERT_BUCKET_BATCH_SIZE
+            )
+            if settings.DISTILBERT_MICROBATCH:
+                self.distil_batcher = MicroBatcher(
+                    lambda texts: self.distil.predict(texts),
+                    max_batch_size=settings.DISTILBERT_MAX_BATCH_SIZE,
+                    max_wait_ms=settings.DISTILBERT_BATCH_WINDOW_MS
+                )
+            if warm:
+                self._warm_up("distilbert", d.predict)
+            self.distil = d
+            print(f"✓ DistilBERT model loaded from {dist_path} (backend: {settings.DISTILBERT_BACKEND})")
+            return "loaded"
         except Exception as e:
             self.distil = None
             print(f"ℹ DistilBERT load failed (optional): {e}")
+            return "failed"
+    
+    def warm_up_distil(self) -> None:
+        
+        if self.distil is not None:
+            self._warm_up("distilbert", self.distil.predict)
+    
+    @property
+    def tfidf(self):
+        
+        return self._snapshot.tfidf
+    
+    @property
+    def _generation(self) -> int:
+        
+        return self._snapshot.generation
+    
+    def _bump_generation(self) -> None:
+        
+        with self._swap_lock:
+            self._snapshot = self._snapshot._replace(generation=self._snapshot.generation + 1)
+    
+    def get_generation(self, snapshot: Optional[ModelSnapshot] = None) -> tuple:
         
+        # Cached predictions are only valid for the exact models, rules and
+        # alias map that produced them
+        snapshot = snapshot or self._snapshot
+        rules_version = getattr(self.rules, "RULES_VERSION", 0) if self.rules else None
+        map_version = self.normalizer.get_map_version() if self.normalizer else None
+        return (snapshot.generation, rules_version, map_version)
+    
+    @staticmethod
+    def _meta_key(meta: Optional[Dict]) -> str:
+        
+        if not meta:
+            return ""
+        return json.dumps(meta, sort_keys=True, default=str)
+    
+    def _normalize(self, texts: List[str]) -> List[str]:
         
+        if not self.normalizer:
+            return list(texts)
+        return [self.normalizer.normalize_text(text) for text in texts]
+    
+    def _apply_rules(self, texts: List[str], metas: List[Optional[Dict]]) -> List[Optional[Dict[str, Any]]]:
+        
+        if not self.rules:
+            return [None] * len(texts)
         try:
-            import ml.rules as rules
-            self.rules = rules
-            print("✓ Rules module loaded")
+            return self.rules.apply_rules_batch(texts, metas)
         except Exception as e:
-            self.rules = None
-            print(f"⚠ Rules module load failed: {e}")
+            print(f"Rule application error: {e}")
+            return [None] * len(texts)
+    
+    def _run_distil(self, texts: List[str], explain: bool = False) -> Optional[List[Dict[str, Any]]]:
         
+        self._ensure_distil()
+        if not self.distil:
+            return None
+        try:
+            # Single texts from concurrent requests are coalesced into one forward pass
+            if self.distil_batcher is not None and len(texts) == 1 and not explain:
+                return [self.distil_batcher.submit(texts[0])]
+            return self.distil.predict(texts, explain=explain)
+        except Exception as e:
+            print(f"DistilBERT prediction error: {e}")
+            return None
+    
+    def _run_tfidf(self, texts: List[str], explain: bool = False, tfidf: Any = None) -> Optional[List[Dict[str, Any]]]:
         
+        tfidf = tfidf or self.tfidf
+        if not tfidf:
+            return None
         try:
-            import ml.fusion as fusion
-            self.fusion = fusion
-            print("✓ Fusion module loaded")
+            return tfidf.predict(texts, explain=explain)
         except Exception as e:
-            self.fusion = None
-            print(f"ℹ Fusion module not available (will use fallback): {e}")
+            print(f"TF-IDF prediction error: {e}")
+            return None
     
-    def predict(self, text: str, meta: Optional[Dict] = None) -> Dict[str, Any]:
+    def predict(self, text: str, meta: Optional[Dict] = None, explain: bool = False) -> Dict[str, Any]:
         
-        if meta is None:
-            meta = {}
+        return self.predict_batch([text], [meta], explain=explain)[0]
+    
+    def predict_batch(
+        self,
+        texts: List[str],
+        metas: Optional[List[Optional[Dict]]] = None,
+        explain: bool = False
+    ) -> List[Dict[str, Any]]:
         
-       
-        rule_output = None
-        if self.rules:
-            try:
-                rule_output = self.rules.apply_rules(text, meta)
-                
-            except Exception as e:
-                print(f"Rule application error: {e}")
-                rule_output = None
+        if metas is None:
+            metas = [None] * len(texts)
+        if len(metas) != len(texts):
+            raise ValueError(f"Got {len(texts)} texts but {len(metas)} metas")
+        if not texts:
+            return []
         
+        self._ensure_watcher()
+        snapshot = self._snapshot
+        texts = self._normalize(texts)
+        if self.cache is None:
+            return self._predict_uncached(texts, metas, explain, snapshot)
         
-        ml_output = None
-        model_used = "none"
+        keys = [(text, self._meta_key(meta), explain) for text, meta in zip(texts, metas)]
+        meta_by_key = dict(zip(keys, metas))
+        return self.cache.get_many(
+            keys,
+            self.get_generation(snapshot),
+            lambda missing: self._predict_uncached(
+                [key[0] for key in missing],
+                [meta_by_key[key] for key in missing],
+                explain,
+                snapshot
+            )
+        )
+    
+    def _predict_uncached(
+        self,
+        texts: List[str],
+        metas: List[Optional[Dict]],
+        explain: bool = False,
+        snapshot: Optional[ModelSnapshot] = None
+    ) -> List[Dict[str, Any]]:
         
-        if self.distil:
-            try:
-                ml_output = self.distil.predict([text])[0]
-                model_used = "distilbert"
-            except Exception as e:
-                print(f"DistilBERT prediction error: {e}")
-                ml_output = None
+        snapshot = snapshot or self._snapshot
+        rule_outputs = self._apply_rules(texts, metas)
         
-        if ml_output is None and self.tfidf:
-            try:
-                ml_output = self.tfidf.predict([text])[0]
-                model_used = "tfidf"
-            except Exception as e:
-                print(f"TF-IDF prediction error: {e}")
-                ml_output = None
+        if settings.LAZY_CASCADE and self.fusion is not None:
+            return self._predict_lazy(texts, rule_outputs, explain, snapshot)
+        
+        # One vectorised call per model over the whole batch
+        distil_outputs = self._run_distil(texts, explain)
+        tfidf_outputs = self._run_tfidf(texts, explain, snapshot.tfidf)
+        
+        if distil_outputs is not None:
+            ml_outputs, model_used = distil_outputs, "distilbert"
+        elif tfidf_outputs is not None:
+            ml_outputs, model_used = tfidf_outputs, "tfidf"
+        else:
+            ml_outputs, model_used = [None] * len(texts), "none"
+        if tfidf_outputs is None:
+            tfidf_outputs = [None] * len(texts)
+        
+        results = []
+        for rule_output, ml_output, tfidf_output in zip(rule_outputs, ml_outputs, tfidf_outputs):
+            if ml_output is None and rule_output is None:
+                raise RuntimeError("No models available for prediction")
+            results.append(self._fuse(rule_output, ml_output, tfidf_output, model_used))
+        return results
+    
+    def _predict_lazy(
+        self,
+        texts: List[str],
+        rule_outputs: List[Optional[Dict[str, Any]]],
+        explain: bool = False,
+        snapshot: Optional[ModelSnapshot] = None
+    ) -> List[Dict[str, Any]]:
+        
+        snapshot = snapshot or self._snapshot
+        if snapshot.tfidf is None and any(r is None for r in rule_outputs):
+            self._ensure_distil()
+            if self.distil is None:
+                raise RuntimeError("No models available for prediction")
+        
+        tfidf_by_index: Dict[int, Dict[str, Any]] = {}
+        
+        def run_tfidf(indices: List[int]) -> Optional[List[Dict[str, Any]]]:
+            outputs = self._run_tfidf([texts[i] for i in indices], explain, snapshot.tfidf)
+            if outputs is not None:
+                tfidf_by_index.update(zip(indices, outputs))
+            return outputs
+        
+        def run_ml(indices: List[int]) -> Optional[List[Dict[str, Any]]]:
+            outputs = self._run_distil([texts[i] for i in indices], explain)
+            if outputs is None and tfidf_by_index:
+                # Same fallback as the eager path: TF-IDF stands in for DistilBERT
+                outputs = [tfidf_by_index.get(i) for i in indices]
+            return outputs
+        
+        return self.fusion.fuse_cascade(rule_outputs, run_tfidf, run_ml)
+    
+    def _fuse(
+        self,
+        rule_output: Optional[Dict[str, Any]],
+        ml_output: Optional[Dict[str, Any]],
+        tfidf_output: Optional[Dict[str, Any]],
+        model_used: str
+    ) -> Dict[str, Any]:
         
-        if ml_output is None and rule_output is None:
-            raise RuntimeError("No models available for prediction")
-
-        tfidf_output = None
-        if self.tfidf:
-            try:
-                tfidf_output = self.tfidf.predict([text])[0]
-            except Exception as e:
-                print(f"TF-IDF prediction error: {e}")
-                tfidf_output = None
-
         if self.fusion and (rule_output or ml_output or tfidf_output):
             try:
                 fused = self.fusion.fuse(rule_output, ml_output, tfidf_output)
@@ -166,24 +753,62 @@ class ModelAdapter:
         
         return fused
     
-    def reload_tfidf_model(self) -> bool:
+    def swap_tfidf_model(self, pipeline) -> None:
+        
+        # Warm the new model before it replaces the one serving traffic; the
+        # generation bump invalidates cached predictions from the old one
+        self._warm_up("tfidf", pipeline.predict)
+        with self._swap_lock:
+            self._snapshot = ModelSnapshot(
+                tfidf=pipeline,
+                tfidf_version=getattr(pipeline, "version", None),
+                generation=self._snapshot.generation + 1
+            )
+    
+    def reload_tfidf_model(self, only_if_changed: bool = False) -> bool:
         
         tfidf_path = settings.TFIDF_MODEL_DIR
         try:
             from ml.tfidf_pipeline import TfidfPipeline
-            p = TfidfPipeline()
-            if os.path.exists(tfidf_path):
-                p.load(tfidf_path)
-                self.tfidf = p
-                print(f"✓ TF-IDF model reloaded from {tfidf_path}")
-                return True
-            else:
+            from ml.model_registry import ModelRegistry
+            if not os.path.exists(tfidf_path):
                 print(f"⚠ TF-IDF model directory not found: {tfidf_path}")
                 return False
+            with self._swap_lock:
+                registry = ModelRegistry(tfidf_path)
+                self._registry_signature = registry.pointer_signature()
+                if only_if_changed and registry.current_version() in (None, self._snapshot.tfidf_version):
+                    return False
+                p = TfidfPipeline()
+                p.load(tfidf_path)
+                self.swap_tfidf_model(p)
+            print(f"✓ TF-IDF model {p.version} reloaded from {tfidf_path}")
+            return True
         except Exception as e:
             print(f"⚠ TF-IDF reload failed: {e}")
             return False
     
+    def _ensure_watcher(self) -> None:
+        
+        # One watcher per worker process: other workers publish or roll back
+        # through the registry, and this one follows the current pointer
+        if settings.MODEL_CHECK_INTERVAL_S <= 0 or not self._ready.is_set():
+            return
+        self._watcher.get()
+    
+    def _watch_registry(self) -> None:
+        
+        from ml.model_registry import ModelRegistry
+        registry = ModelRegistry(settings.TFIDF_MODEL_DIR)
+        while True:
+            time.sleep(settings.MODEL_CHECK_INTERVAL_S)
+            try:
+                # stat() of the pointer file; the model is only read when it changed
+                if registry.pointer_signature() != self._registry_signature:
+                    self.reload_tfidf_model(only_if_changed=True)
+            except Exception as e:
+                print(f"⚠ Model registry check failed: {e}")
+    
     def get_model_status(self) -> Dict[str, bool]:
         
         return {
@@ -192,3 +817,18 @@ class ModelAdapter:
             "rules": self.rules is not None,
             "fusion": self.fusion is not None
         }
+    
+    def get_model_versions(self) -> Dict[str, Optional[str]]:
+        
+        return {"tfidf": self._snapshot.tfidf_version}
+    
+    def get_stats(self) -> Dict[str, Any]:
+        
+        return {
+            "generation": self._generation,
+            "model_versions": self.get_model_versions(),
+            "prediction_cache": self.cache.get_stats() if self.cache else None,
+            "distilbert_batcher": self.distil_batcher.get_stats() if self.distil_batcher else None,
+            "distilbert": self.distil.get_stats() if self.distil else None,
+            "warmup_ms": dict(self.warmup_timings)
+        }
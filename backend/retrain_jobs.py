@@ -0,0 +1,172 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+ACTIVE_PHASES = ("queued", "running")
+TERMINAL_STATUSES = ("complete", "error", "cancelled")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class RetrainJob:
+
+    # Status goes queued -> running -> complete | error | cancelled; phase is
+    # the finer-grained step inside "running" (loading_data, training, ...)
+
+    def __init__(self, mode: str, model: str):
+
+        self.id = uuid.uuid4().hex[:12]
+        self.mode = mode
+        self.model = model
+        self.status = "queued"
+        self.phase = "queued"
+        self.progress = 0.0
+        self.details = ""
+        self.metrics: Dict[str, Any] = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def update(self, phase: Optional[str] = None, progress: Optional[float] = None) -> None:
+
+        # Called by the runner at safe points; doubles as the cancellation check
+        self.check_cancelled()
+        with self._lock:
+            if phase is not None:
+                self.phase = phase
+            if progress is not None:
+                self.progress = round(min(1.0, max(0.0, progress)), 4)
+
+    def check_cancelled(self) -> None:
+
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self) -> bool:
+
+        if self._done.is_set():
+            return False
+        self._cancel.set()
+        return True
+
+    @property
+    def cancel_requested(self) -> bool:
+
+        return self._cancel.is_set()
+
+    def _finish(self, status: str, details: str, metrics: Optional[Dict[str, Any]] = None) -> None:
+
+        with self._lock:
+            self.status = status
+            self.phase = status
+            self.details = details
+            if metrics:
+                self.metrics.update(metrics)
+            if status == "complete":
+                self.progress = 1.0
+            self.finished_at = time.time()
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                "job_id": self.id,
+                "mode": self.mode,
+                "model": self.model,
+                "status": self.status,
+                "phase": self.phase,
+                "progress": self.progress,
+                "cancel_requested": self._cancel.is_set() and self.status not in TERMINAL_STATUSES,
+                "details": self.details,
+                "metrics": dict(self.metrics),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "duration_s": round(end - self.started_at, 3) if self.started_at else None
+            }
+
+
+class RetrainJobManager:
+
+    # Runs retrains one at a time on their own thread, so a long training run
+    # never occupies an API worker. Submitting while a job is active returns
+    # that job instead of starting another (single-flight).
+
+    def __init__(self, max_history: int = 50):
+
+        self.max_history = max(1, max_history)
+        self._jobs: "OrderedDict[str, RetrainJob]" = OrderedDict()
+        self._active: Optional[RetrainJob] = None
+        self._lock = threading.Lock()
+
+    def submit(self, mode: str, model: str, runner: Callable[[RetrainJob], Dict[str, Any]]) -> tuple:
+
+        with self._lock:
+            if self._active is not None and self._active.status in ACTIVE_PHASES:
+                return self._active, False
+            job = RetrainJob(mode, model)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_history:
+                self._jobs.popitem(last=False)
+            self._active = job
+
+        thread = threading.Thread(target=self._run, args=(job, runner), name=f"retrain-{job.id}", daemon=True)
+        thread.start()
+        return job, True
+
+    def _run(self, job: RetrainJob, runner: Callable[[RetrainJob], Dict[str, Any]]) -> None:
+
+        with job._lock:
+            job.status = "running"
+            job.started_at = time.time()
+        try:
+            job.check_cancelled()
+            result = runner(job)
+            metrics = {k: v for k, v in result.items() if k not in ("status", "details")}
+            job._finish(result.get("status", "complete"), result.get("details", ""), metrics)
+        except JobCancelled:
+            job._finish("cancelled", "Retrain cancelled; the serving model was not changed")
+        except Exception as e:
+            job._finish("error", f"Retrain failed: {e}")
+        finally:
+            with self._lock:
+                if self._active is job:
+                    self._active = None
+        print(f"Retrain job {job.id} finished: {job.status}")
+
+    def get(self, job_id: str) -> Optional[RetrainJob]:
+
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active(self) -> Optional[RetrainJob]:
+
+        with self._lock:
+            return self._active
+
+    def list(self, limit: int = 10) -> List[Dict[str, Any]]:
+
+        with self._lock:
+            jobs = list(self._jobs.values())[-limit:]
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+
+        job = self.active()
+        if job is not None:
+            job.cancel()
+            job.wait(timeout)
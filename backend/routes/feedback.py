@@ -1,18 +1,37 @@
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, List, Tuple, Any
 import sys
 import os
+import re
+import json
+import codecs
 
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from backend.storage import save_feedback, get_feedback_count
+from backend.storage import (
+    save_feedback_async, save_feedback_many, save_feedback_many_async, get_feedback_count_async, get_db_stats,
+    compact_feedback_async, get_feedback_summary_async
+)
+from backend.feedback_queue import FeedbackWriteQueue, FeedbackQueueFull
+from backend.config import settings
 
 router = APIRouter()
 
 
+# Single feedback posts are acknowledged once queued and committed in batches
+# by a background writer, so they never hold a request open on an fsync
+feedback_queue = FeedbackWriteQueue(
+    save_feedback_many,
+    max_size=settings.FEEDBACK_QUEUE_MAX_SIZE,
+    batch_size=settings.FEEDBACK_FLUSH_BATCH_SIZE,
+    flush_interval_ms=settings.FEEDBACK_FLUSH_INTERVAL_MS,
+    retry_after_s=settings.FEEDBACK_RETRY_AFTER_S
+)
+
+
 class FeedbackRequest(BaseModel):
     
     text: str = Field(..., description="Transaction text", min_length=1)
@@ -31,23 +50,37 @@ class FeedbackRequest(BaseModel):
 
 class FeedbackResponse(BaseModel):
     
-    status: str = Field(..., description="Status of the operation")
-    id: int = Field(..., description="ID of the saved feedback")
+    status: str = Field(..., description="saved, or queued when written behind")
+    id: Optional[int] = Field(None, description="ID of the saved feedback (not yet known when queued)")
     message: str = Field(..., description="Human-readable message")
 
 
 @router.post("/feedback", response_model=FeedbackResponse)
-def post_feedback(req: FeedbackRequest) -> FeedbackResponse:
+async def post_feedback(req: FeedbackRequest) -> FeedbackResponse:
     
     try:
         
-        fid = save_feedback(req.text, req.correct_label, req.user_id)
+        if settings.FEEDBACK_WRITE_BEHIND:
+            feedback_queue.enqueue(req.text, req.correct_label, req.user_id)
+            return FeedbackResponse(
+                status="queued",
+                id=None,
+                message="Feedback accepted and queued for saving"
+            )
+        
+        fid = await save_feedback_async(req.text, req.correct_label, req.user_id)
         
         return FeedbackResponse(
             status="saved",
             id=fid,
             message=f"Feedback saved successfully with ID {fid}"
         )
+    except FeedbackQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after_s)}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -55,14 +88,244 @@ def post_feedback(req: FeedbackRequest) -> FeedbackResponse:
         )
 
 
+class BulkFeedbackResult(BaseModel):
+    
+    index: int = Field(..., description="Position of the row in the request body (0-based)")
+    id: Optional[int] = Field(None, description="ID of the saved feedback")
+    error: Optional[str] = Field(None, description="Why the row was rejected")
+
+
+class BulkFeedbackResponse(BaseModel):
+    
+    status: str = Field(..., description="saved, partial or error")
+    received: int = Field(..., description="Rows read from the body")
+    saved: int = Field(..., description="Rows written")
+    failed: int = Field(..., description="Rows rejected")
+    results: List[BulkFeedbackResult] = Field(..., description="Per-row id or error, in input order")
+
+
+class _BulkWriter:
+    
+    # Buffers validated rows and writes them in chunked transactions as the
+    # body is read, so memory stays bounded by the chunk size, not the import
+    
+    def __init__(self, chunk_size: int):
+        
+        self.chunk_size = max(1, chunk_size)
+        self.pending: List[Tuple[int, Tuple[str, str, Optional[str]]]] = []
+        self.results: List[BulkFeedbackResult] = []
+        self.received = 0
+        self.saved = 0
+    
+    def _reject(self, index: int, error: str) -> None:
+        
+        self.results.append(BulkFeedbackResult(index=index, error=error))
+    
+    async def add(self, row: Any) -> None:
+        
+        index = self.received
+        self.received += 1
+        if self.received > settings.FEEDBACK_BULK_MAX_ROWS:
+            # Earlier chunks are already committed, so excess rows are
+            # reported per row rather than failing the whole request
+            self._reject(index, f"row limit exceeded (max {settings.FEEDBACK_BULK_MAX_ROWS} per request)")
+            return
+        try:
+            req = FeedbackRequest.model_validate(row)
+        except ValidationError as e:
+            self._reject(index, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+            ))
+            return
+        self.pending.append((index, (req.text, req.correct_label, req.user_id)))
+        if len(self.pending) >= self.chunk_size:
+            await self.flush()
+    
+    def add_invalid(self, error: str) -> None:
+        
+        self._reject(self.received, error)
+        self.received += 1
+    
+    async def flush(self) -> None:
+        
+        if not self.pending:
+            return
+        chunk, self.pending = self.pending, []
+        try:
+            ids = await save_feedback_many_async([row for _, row in chunk])
+        except Exception as e:
+            for index, _ in chunk:
+                self._reject(index, f"write failed: {e}")
+            return
+        self.results.extend(BulkFeedbackResult(index=index, id=fid) for (index, _), fid in zip(chunk, ids))
+        self.saved += len(ids)
+    
+    def response(self) -> BulkFeedbackResponse:
+        
+        self.results.sort(key=lambda r: r.index)
+        failed = self.received - self.saved
+        if failed == 0:
+            status = "saved"
+        elif self.saved:
+            status = "partial"
+        else:
+            status = "error"
+        return BulkFeedbackResponse(
+            status=status,
+            received=self.received,
+            saved=self.saved,
+            failed=failed,
+            results=self.results
+        )
+
+
+async def _read_ndjson(head: bytes, body, writer: _BulkWriter) -> None:
+    
+    buffer = head
+    while True:
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                await _add_json_line(line, writer)
+        try:
+            buffer += await body.__anext__()
+        except StopAsyncIteration:
+            break
+    if buffer.strip():
+        await _add_json_line(buffer, writer)
+
+
+_PARTIAL_TOKEN_CHARS = 12
+_NUMBER_TAIL_RE = re.compile(r"[0-9.eE+-]*\Z")
+_WHITESPACE_RE = re.compile(r"\s*")
+
+
+async def _read_json_array(head: bytes, body, writer: _BulkWriter) -> None:
+    
+    # Decodes one array element at a time as the body streams in, so only the
+    # element being parsed is buffered, never the whole array. pos walks the
+    # buffer; it is only cut down when the next chunk is appended
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = utf8.decode(head)
+    pos = buffer.index("[") + 1
+    expect_value, first, eof = True, True, False
+    while True:
+        pos = _WHITESPACE_RE.match(buffer, pos).end()
+        ahead = pos < len(buffer)
+        if ahead and (first or not expect_value) and buffer[pos] == "]":
+            break
+        if ahead and not expect_value:
+            if buffer[pos] != ",":
+                raise ValueError(f"expected ',' or ']' but found {buffer[pos:pos + 20]!r}")
+            pos += 1
+            expect_value = True
+            continue
+        if ahead:
+            try:
+                row, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # An element cut off by the chunk boundary fails at its last
+                # partial token (or its open string); anything earlier is a
+                # real syntax error that more data cannot fix
+                if eof or not (e.msg.startswith("Unterminated string") or len(buffer) - e.pos <= _PARTIAL_TOKEN_CHARS):
+                    raise
+            else:
+                # A number running up to the end of the buffer may continue
+                # in the next chunk
+                number_cut = not isinstance(row, (dict, list, str)) and _NUMBER_TAIL_RE.match(buffer, end) is not None
+                if eof or not number_cut:
+                    pos = end
+                    first = expect_value = False
+                    await writer.add(row)
+                    continue
+        if eof:
+            raise ValueError("unterminated array")
+        try:
+            chunk = utf8.decode(await body.__anext__())
+        except StopAsyncIteration:
+            chunk = utf8.decode(b"", final=True)
+            eof = True
+        buffer, pos = buffer[pos:] + chunk, 0
+    
+    trailing = buffer[pos + 1:]
+    async for chunk in body:
+        trailing += utf8.decode(chunk)
+        if trailing.strip():
+            break
+    if trailing.strip():
+        raise ValueError(f"unexpected data after the array: {trailing.strip()[:20]!r}")
+
+
+async def _add_json_line(line: bytes, writer: _BulkWriter) -> None:
+    
+    try:
+        row = json.loads(line)
+    except ValueError as e:
+        writer.add_invalid(f"invalid JSON: {e}")
+        return
+    await writer.add(row)
+
+
+@router.post(
+    "/feedback/bulk",
+    response_model=BulkFeedbackResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/FeedbackRequest"}}
+                },
+                "application/x-ndjson": {
+                    "schema": {"$ref": "#/components/schemas/FeedbackRequest"}
+                }
+            }
+        }
+    }
+)
+async def post_feedback_bulk(request: Request) -> BulkFeedbackResponse:
+    
+    # The body is either a JSON array or NDJSON (one correction object per
+    # line); which one is decided from the first non-blank byte. Either is
+    # parsed and written while it streams in
+    writer = _BulkWriter(settings.FEEDBACK_BULK_CHUNK_SIZE)
+    body = request.stream().__aiter__()
+    head = b""
+    async for chunk in body:
+        head += chunk
+        if head.strip():
+            break
+    
+    if head.lstrip().startswith(b"["):
+        try:
+            await _read_json_array(head, body, writer)
+        except ValueError as e:
+            if writer.received == 0:
+                raise HTTPException(status_code=400, detail=f"Invalid JSON array: {e}")
+            # Rows before the error may already be committed; report the rest
+            # of the body as one rejected entry
+            writer.add_invalid(f"invalid JSON array: {e}")
+    else:
+        await _read_ndjson(head, body, writer)
+    
+    if writer.received == 0:
+        raise HTTPException(status_code=400, detail="No feedback rows in request body")
+    await writer.flush()
+    return writer.response()
+
+
 @router.get("/feedback/count")
-def get_feedback_stats() -> dict:
+async def get_feedback_stats() -> dict:
     
     try:
-        count = get_feedback_count()
+        count = await get_feedback_count_async()
+        pending = feedback_queue.get_stats()["pending"]
         return {
             "status": "ok",
             "total_feedback": count,
+            "pending_feedback": pending,
             "message": f"Total feedback samples: {count}"
         }
     except Exception as e:
@@ -70,3 +333,47 @@ def get_feedback_stats() -> dict:
             status_code=500,
             detail=f"Failed to get feedback count: {str(e)}"
         )
+
+
+@router.get("/feedback/stats")
+async def get_feedback_queue_stats() -> dict:
+    
+    return {
+        "status": "ok",
+        "write_behind": settings.FEEDBACK_WRITE_BEHIND,
+        "queue": feedback_queue.get_stats(),
+        "db": get_db_stats(),
+        "storage": await get_feedback_summary_async()
+    }
+
+
+class CompactRequest(BaseModel):
+    
+    older_than_days: float = Field(
+        default=settings.FEEDBACK_COMPACT_AFTER_DAYS,
+        ge=0,
+        description="Only raw rows older than this are deleted"
+    )
+
+
+@router.post("/feedback/compact")
+async def compact_feedback_rows(req: Optional[CompactRequest] = None) -> dict:
+    
+    # Raw rows are folded into the aggregated view first; rows that the serving
+    # model or a retained (rollback-able) version has not learned yet are kept
+    from backend.routes.models import retained_feedback_watermark
+    req = req or CompactRequest()
+    try:
+        keep_after_id = retained_feedback_watermark()
+        deleted = await compact_feedback_async(req.older_than_days * 86400, keep_after_id)
+        return {
+            "status": "ok",
+            "deleted": deleted,
+            "kept_after_id": keep_after_id,
+            "storage": await get_feedback_summary_async()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to compact feedback: {str(e)}"
+        )
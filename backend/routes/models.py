@@ -0,0 +1,100 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Optional
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.config import settings
+from ml.model_registry import ModelRegistry, RegistryError
+
+router = APIRouter()
+
+
+class ActivateRequest(BaseModel):
+
+    version: Optional[str] = Field(
+        None,
+        description="Version to make current; rollback defaults to the previous one"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "version": "20250101T120000-a1b2c3"
+            }
+        }
+
+
+def _registry() -> ModelRegistry:
+
+    return ModelRegistry(settings.TFIDF_MODEL_DIR)
+
+
+def retained_feedback_watermark() -> int:
+
+    # Raw feedback after this id must be kept: the serving model or any version
+    # it can be rolled back to may still need it for an incremental update
+    from backend.routes.predict import adapter
+
+    tfidf = adapter.tfidf if adapter is not None else None
+    watermarks = [getattr(tfidf, "feedback_watermark", 0) if tfidf is not None else 0]
+    lowest = _registry().min_metadata("feedback_watermark")
+    if lowest is not None:
+        watermarks.append(lowest)
+    return min(watermarks)
+
+
+def _activate(version: Optional[str], rollback: bool) -> dict:
+
+    from backend.routes.predict import adapter
+
+    registry = _registry()
+    previous = registry.current_version()
+    try:
+        if rollback:
+            version = registry.rollback(version)
+        elif version is None:
+            raise HTTPException(status_code=400, detail="version is required")
+        else:
+            version = registry.set_current(version)
+    except RegistryError as e:
+        status = 404 if "Unknown" in str(e) else 409
+        raise HTTPException(status_code=status, detail=str(e))
+
+    # This worker swaps now; the others pick the pointer change up on their
+    # next registry check (MODEL_CHECK_INTERVAL_S)
+    reloaded = adapter.reload_tfidf_model() if adapter is not None else False
+    return {
+        "status": "ok" if reloaded else "activated",
+        "version": version,
+        "previous": previous,
+        "serving": adapter.get_model_versions()["tfidf"] if adapter is not None else None
+    }
+
+
+@router.get("/models/tfidf/versions")
+def list_tfidf_versions() -> dict:
+
+    from backend.routes.predict import adapter
+
+    registry = _registry()
+    return {
+        "current": registry.current_version(),
+        "serving": adapter.get_model_versions()["tfidf"] if adapter is not None else None,
+        "versions": registry.list_versions()
+    }
+
+
+@router.post("/models/tfidf/activate")
+def activate_tfidf_version(req: ActivateRequest) -> dict:
+
+    return _activate(req.version, rollback=False)
+
+
+@router.post("/models/tfidf/rollback")
+def rollback_tfidf_version(req: Optional[ActivateRequest] = None) -> dict:
+
+    return _activate(req.version if req else None, rollback=True)
@@ -1,7 +1,7 @@
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import sys
 import os
 
@@ -9,12 +9,23 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from backend.model_adapter import ModelAdapter
+from backend.executor import ComputeExecutor, ExecutorSaturated
+from backend.config import settings
 
 router = APIRouter()
 
 
+compute_executor = ComputeExecutor(
+    max_workers=settings.PREDICT_WORKERS,
+    max_in_flight=settings.PREDICT_MAX_IN_FLIGHT,
+    retry_after_s=settings.PREDICT_RETRY_AFTER_S
+)
+
+
 try:
-    adapter = ModelAdapter()
+    # With BACKGROUND_MODEL_LOAD the models load on a thread started from the
+    # app's startup hook, so the port opens immediately and /ready reports progress
+    adapter = ModelAdapter(load_models=not settings.BACKGROUND_MODEL_LOAD)
     print("Model adapter initialized successfully")
 except Exception as e:
     print(f"Warning: Model adapter initialization failed: {e}")
@@ -25,12 +36,14 @@ class PredictRequest(BaseModel):
     
     text: str = Field(..., description="Transaction description text", min_length=1)
     meta: Optional[Dict[str, Any]] = Field(None, description="Optional metadata (MCC, time, etc.)")
+    explain: bool = Field(False, description="Include token-level attributions (slower; meant for interactive use)")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "text": "STARBCKS #1023 MUMBAI 12:32PM",
-                "meta": {"mcc": None, "time": "12:32PM"}
+                "meta": {"mcc": None, "time": "12:32PM"},
+                "explain": True
             }
         }
 
@@ -43,18 +56,47 @@ class PredictResponse(BaseModel):
     model_used: str = Field(..., description="Which model(s) were used")
 
 
-@router.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest) -> PredictResponse:
+def _saturated(e: ExecutorSaturated) -> HTTPException:
+    
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after_s)}
+    )
+
+
+def _check_ready() -> None:
     
     if adapter is None:
         raise HTTPException(
             status_code=503,
             detail="Model adapter not initialized. Please check model files."
         )
+    if not adapter.is_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="Models are still loading",
+            headers={"Retry-After": str(settings.PREDICT_RETRY_AFTER_S)}
+        )
+
+
+def _set_timing_headers(response: Response, timing: Dict[str, float]) -> None:
+    
+    # Queue wait (admission -> worker pickup) and compute are reported apart
+    response.headers["Server-Timing"] = (
+        f"queue;dur={timing['queue_ms']:.2f}, compute;dur={timing['compute_ms']:.2f}"
+    )
+
+
+@router.post("/predict", response_model=PredictResponse)
+async def predict(req: PredictRequest, response: Response) -> PredictResponse:
+    
+    _check_ready()
     
     try:
         
-        fused = adapter.predict(req.text, req.meta)
+        fused, timing = await compute_executor.run(adapter.predict, req.text, req.meta, req.explain)
+        _set_timing_headers(response, timing)
         
         
         return PredictResponse(
@@ -63,6 +105,8 @@ def predict(req: PredictRequest) -> PredictResponse:
             explanation=fused["rationale"],
             model_used=fused.get("model_used", "unknown")
         )
+    except ExecutorSaturated as e:
+        raise _saturated(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -70,6 +114,72 @@ def predict(req: PredictRequest) -> PredictResponse:
         )
 
 
+class PredictBatchRequest(BaseModel):
+    
+    texts: List[str] = Field(..., description="Transaction description texts", min_length=1)
+    metas: Optional[List[Optional[Dict[str, Any]]]] = Field(
+        None,
+        description="Optional per-text metadata, same length and order as texts"
+    )
+    explain: bool = Field(False, description="Include token-level attributions for every row")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": ["STARBCKS #1023 MUMBAI 12:32PM", "UBER TRIP HELP.UBER.COM"],
+                "metas": [{"time": "12:32PM"}, None]
+            }
+        }
+
+
+class PredictBatchResponse(BaseModel):
+    
+    results: List[PredictResponse] = Field(..., description="Predictions in the same order as the input texts")
+    count: int = Field(..., description="Number of predictions returned")
+
+
+@router.post("/predict/batch", response_model=PredictBatchResponse)
+async def predict_batch(req: PredictBatchRequest, response: Response) -> PredictBatchResponse:
+    
+    _check_ready()
+    
+    if len(req.texts) > settings.PREDICT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(req.texts)} texts (max {settings.PREDICT_BATCH_MAX_SIZE})"
+        )
+    
+    if req.metas is not None and len(req.metas) != len(req.texts):
+        raise HTTPException(
+            status_code=422,
+            detail=f"metas must have the same length as texts ({len(req.metas)} != {len(req.texts)})"
+        )
+    
+    try:
+        
+        fused_list, timing = await compute_executor.run(adapter.predict_batch, req.texts, req.metas, req.explain)
+        _set_timing_headers(response, timing)
+        
+        
+        results = [
+            PredictResponse(
+                category=fused["label"],
+                confidence=fused["confidence"],
+                explanation=fused["rationale"],
+                model_used=fused.get("model_used", "unknown")
+            )
+            for fused in fused_list
+        ]
+        return PredictBatchResponse(results=results, count=len(results))
+    except ExecutorSaturated as e:
+        raise _saturated(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+
+
 @router.get("/model-status")
 def get_model_status() -> Dict[str, Any]:
     
@@ -85,6 +195,7 @@ def get_model_status() -> Dict[str, Any]:
         return {
             "status": "ok",
             "models": status,
+            "stats": {**adapter.get_stats(), "executor": compute_executor.get_stats()},
             "message": "Model status retrieved successfully"
         }
     except Exception as e:
@@ -107,7 +218,7 @@ def get_categories() -> Dict[str, Any]:
     
     try:
         
-        categories = list(adapter.tfidf.le.classes_)
+        categories = list(adapter.tfidf.classes)
         return {
             "status": "ok",
             "categories": categories,
@@ -1,17 +1,22 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import Literal, Optional
 import sys
 import os
+import time
 
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from backend.storage import get_feedback_samples
+from backend.storage import get_feedback_samples, collapse_feedback, compact_feedback
+from backend.retrain_jobs import RetrainJob, RetrainJobManager, JobCancelled
+from backend.trainer import run_full_tfidf
 from backend.config import settings
 
 router = APIRouter()
 
+job_manager = RetrainJobManager(max_history=settings.RETRAIN_JOB_HISTORY)
+
 class RetrainRequest(BaseModel):
     
     mode: Literal["incremental", "full"] = Field(
@@ -32,139 +37,257 @@ class RetrainRequest(BaseModel):
 
 class RetrainResponse(BaseModel):
     
-    status: str = Field(..., description="Status: started, complete, or error")
+    status: str = Field(..., description="Status: started, running, complete, error or cancelled")
     details: str = Field(..., description="Details about the retrain operation")
     samples_used: int = Field(default=0, description="Number of feedback samples used")
+    job_id: Optional[str] = Field(None, description="Retrain job ID; poll /retrain/{job_id} for progress")
 
-def _run_full_tfidf() -> dict:
+def _run_full_tfidf(job: RetrainJob) -> dict:
   
     try:
+        job.update("loading_data", 0.05)
         from ml.tfidf_pipeline import TfidfPipeline
-        from ml.data_pipeline import normalize_text
-        import pandas as pd
-        import os
-        
-        BASE_DATASET = "data/train.csv"  
-        
-        
-        if not os.path.exists(BASE_DATASET):
-            return {
-                "status": "error",
-                "details": f"Base dataset not found at {BASE_DATASET}",
-                "samples_used": 0
-            }
+        from ml.model_registry import ModelRegistry
         
-        base_df = pd.read_csv(BASE_DATASET)
+        # Include corrections that were acknowledged but are still queued
+        from backend.routes.feedback import feedback_queue
+        feedback_queue.wait_flushed(timeout=settings.FEEDBACK_DRAIN_TIMEOUT_S)
         
+        result = run_full_tfidf(job)
+        if result.get("status") != "complete":
+            return result
+        version = result["model_version"]
         
-        samples = get_feedback_samples()
-        feedback_count = len(samples)
-        
-        
-        if feedback_count > 0:
-            
-            feedback_data = [(text, label) for _, text, label in samples]
-            fb_df = pd.DataFrame(feedback_data, columns=["transaction_text", "category"])
-            
-            combined_df = pd.concat([base_df, fb_df], ignore_index=True)
-        else:
-            
-            combined_df = base_df
-        
-        
-        texts = combined_df["transaction_text"].map(normalize_text).tolist()
-        labels = combined_df["category"].tolist()
-        
-        
-        unique_categories = sorted(set(labels))
-        base_categories = sorted(set(base_df["category"].unique()))
+        # Last point where cancelling leaves the serving model untouched; the
+        # published version stays inactive and is pruned later
+        job.update("swapping", 0.95)
+        registry = ModelRegistry(settings.TFIDF_MODEL_DIR)
+        registry.set_current(version)
+        removed = registry.prune(keep=settings.MODEL_REGISTRY_KEEP)
+        if removed:
+            print(f"ℹ Pruned {len(removed)} old TF-IDF model versions")
         
+        verify_pipeline = TfidfPipeline()
+        verify_pipeline.load(settings.TFIDF_MODEL_DIR, version=version)
+        verified_categories = sorted([str(c) for c in verify_pipeline.classes])
         
-        if len(unique_categories) < len(base_categories):
-            print(f"WARNING: Combined dataset has {len(unique_categories)} categories but base had {len(base_categories)}")
-            print(f"Base categories: {base_categories}")
-            print(f"Combined categories: {unique_categories}")
+        if len(verified_categories) != result["categories_trained"]:
+            print(f"ERROR: Model save/load mismatch! Saved {result['categories_trained']} but loaded {len(verified_categories)}")
         
+        # Swap the verified on-disk artifact into the serving adapter
+        details = result["details"] + f". Categories: {len(verified_categories)} (base had {result['base_categories_count']}, expected 8)"
+        details += _swap_into_adapter(verify_pipeline)
         
-        pipeline = TfidfPipeline()
-        pipeline.fit(texts, labels)   
-        pipeline.save(settings.TFIDF_MODEL_DIR)
+        # Raw rows live on in the aggregated view, so old ones can go, but only
+        # up to the lowest watermark of any version a rollback could restore
+        compacted = 0
+        if settings.FEEDBACK_AGGREGATE and settings.FEEDBACK_COMPACT_AFTER_DAYS > 0:
+            try:
+                from backend.routes.models import retained_feedback_watermark
+                compacted = compact_feedback(
+                    settings.FEEDBACK_COMPACT_AFTER_DAYS * 86400,
+                    keep_after_id=retained_feedback_watermark()
+                )
+            except Exception as e:
+                print(f"⚠ Feedback compaction failed: {e}")
         
+        return {
+            **result,
+            "details": details,
+            "feedback_compacted": compacted,
+            "categories_trained": len(verified_categories),
+            "categories_list": verified_categories
+        }
+    except JobCancelled:
+        raise
+    except Exception as e:
+        import traceback
+        return {
+            "status": "error",
+            "details": f"Retrain failed: {str(e)}\n{traceback.format_exc()}",
+            "samples_used": 0
+        }
+
+def _publish_tfidf(pipeline, metadata: dict) -> str:
+    
+    # Written as a new immutable version and activated by swapping the
+    # registry's current pointer; other workers follow the pointer
+    from ml.model_registry import ModelRegistry
+    registry = ModelRegistry(settings.TFIDF_MODEL_DIR)
+    version = registry.publish(pipeline, metadata=metadata)
+    pipeline.version = version
+    removed = registry.prune(keep=settings.MODEL_REGISTRY_KEEP)
+    if removed:
+        print(f"ℹ Pruned {len(removed)} old TF-IDF model versions")
+    return version
+
+def _swap_into_adapter(pipeline) -> str:
+    
+    try:
+        from backend.routes.predict import adapter
+        if adapter is None:
+            return " | WARNING: Adapter not available - restart backend to use new model."
+        adapter.swap_tfidf_model(pipeline)
+        return " | Model reloaded in memory."
+    except Exception as e:
+        return f" | WARNING: Could not reload model: {str(e)} - restart backend to use new model."
+
+def _run_incremental_tfidf(job: RetrainJob) -> dict:
+    
+    try:
+        job.update("loading_data", 0.05)
+        import copy
+        from backend.routes.predict import adapter
+        from backend.routes.feedback import feedback_queue
         
-        trained_categories = sorted([str(c) for c in pipeline.le.classes_])
+        if adapter is None or adapter.tfidf is None:
+            return {"status": "error", "details": "No TF-IDF model loaded to update", "samples_used": 0}
+        if not adapter.tfidf.incremental:
+            # A fixed-vocabulary model cannot partial_fit new words, so the
+            # feedback is learned by a full retrain instead
+            print("ℹ Loaded TF-IDF model has a fixed vocabulary; running a full retrain instead of an incremental update")
+            result = _run_full_tfidf(job)
+            if result.get("status") == "complete":
+                result["details"] = (
+                    "The loaded TF-IDF model uses a fixed vocabulary (TFIDF_HASHING=false), so a full retrain "
+                    "ran instead of an incremental update. " + result["details"]
+                )
+                result["fallback"] = "full"
+            return result
         
+        feedback_queue.wait_flushed(timeout=settings.FEEDBACK_DRAIN_TIMEOUT_S)
         
-        verify_pipeline = TfidfPipeline()
-        verify_pipeline.load(settings.TFIDF_MODEL_DIR)
-        verified_categories = sorted([str(c) for c in verify_pipeline.le.classes_])
+        started = time.perf_counter()
+        live = adapter.tfidf
+        samples = get_feedback_samples(limit=settings.INCREMENTAL_MAX_SAMPLES, after_id=live.feedback_watermark)
+        if not samples:
+            return {
+                "status": "complete",
+                "details": f"No new feedback since the last update (feedback id {live.feedback_watermark})",
+                "samples_used": 0
+            }
         
-        if len(verified_categories) != len(trained_categories):
-            print(f"ERROR: Model save/load mismatch! Saved {len(trained_categories)} but loaded {len(verified_categories)}")
+        # Train a copy so requests keep using the current model until the swap
+        job.update("training", 0.1)
+        model = copy.deepcopy(live)
+        known = set(model.classes.tolist())
+        # Repeated corrections of one text become a single weighted row
+        collapsed = collapse_feedback(samples, settings.FEEDBACK_MAX_WEIGHT)
+        texts = [norm for norm, _, _ in collapsed]
+        labels = [label for _, label, _ in collapsed]
+        model.partial_fit(
+            texts, labels,
+            batch_size=settings.INCREMENTAL_BATCH_SIZE,
+            epochs=settings.INCREMENTAL_EPOCHS,
+            progress=lambda done: job.update(progress=0.1 + 0.8 * done),
+            sample_weight=[weight for _, _, weight in collapsed]
+        )
+        used = len(samples)
+        model.feedback_watermark = samples[-1][0]
+        job.update("saving", 0.9)
+        version = _publish_tfidf(model, {
+            "mode": "incremental",
+            "base_version": live.version,
+            "samples_used": used,
+            "feedback_watermark": model.feedback_watermark
+        })
+        job.update("swapping", 0.95)
+        adapter.swap_tfidf_model(model)
+        elapsed = time.perf_counter() - started
         
+        new_categories = sorted(set(labels) - known)
+        details = (
+            f"Incremental TF-IDF update (model version {version}): {used} feedback samples "
+            f"(ids {samples[0][0]}-{samples[-1][0]}, {len(collapsed)} distinct texts) applied in {elapsed:.2f}s. Model reloaded in memory."
+        )
+        if new_categories:
+            details += f" New categories: {', '.join(new_categories)}."
         return {
             "status": "complete",
-            "details": f"Full TF-IDF retrain completed: {len(base_df)} base samples + {feedback_count} feedback samples = {len(combined_df)} total. Categories: {len(verified_categories)} (base had {len(base_categories)}, expected 8)",
-            "samples_used": len(combined_df),
-            "categories_trained": len(verified_categories),
-            "categories_list": verified_categories,
-            "base_categories_count": len(base_categories)
+            "details": details,
+            "model_version": version,
+            "samples_used": used,
+            "categories_trained": len(model.classes),
+            "categories_list": sorted(str(c) for c in model.classes),
+            "new_categories": new_categories,
+            "feedback_watermark": model.feedback_watermark,
+            "train_seconds": round(elapsed, 3)
         }
+    except JobCancelled:
+        raise
     except Exception as e:
         import traceback
         return {
             "status": "error",
-            "details": f"Retrain failed: {str(e)}\n{traceback.format_exc()}",
+            "details": f"Incremental update failed: {str(e)}\n{traceback.format_exc()}",
             "samples_used": 0
         }
 
 @router.post("/retrain", response_model=RetrainResponse)
-def retrain(req: RetrainRequest, background_tasks: BackgroundTasks) -> RetrainResponse:
+def retrain(req: RetrainRequest) -> RetrainResponse:
     
     if req.model != "tfidf":
         raise HTTPException(
             status_code=400,
-            detail="Only TF-IDF full retrain is supported via API for this demo."
+            detail="Only TF-IDF retrain is supported via API for this demo."
         )
     
+    # Training runs on the job manager's own thread, never on an API worker;
+    # a request that arrives while a job is active joins that job
+    runner = _run_incremental_tfidf if req.mode == "incremental" else _run_full_tfidf
+    job, created = job_manager.submit(req.mode, req.model, runner)
+    
     if settings.RETRAIN_SYNC:
-        try:
-            
-            result = _run_full_tfidf()
-            
-            
-            try:
-                from backend.routes.predict import adapter
-                if adapter is not None:
-                    reload_success = adapter.reload_tfidf_model()
-                    if reload_success:
-                        result["details"] += " | Model reloaded in memory."
-                    else:
-                        result["details"] += " | WARNING: Model reload failed - restart backend to use new model."
-                else:
-                    result["details"] += " | WARNING: Adapter not available - restart backend to use new model."
-            except Exception as e:
-                result["details"] += f" | WARNING: Could not reload model: {str(e)} - restart backend to use new model."
-            
-            return RetrainResponse(**result)
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Retrain failed: {str(e)}",
-            )
-    else:
-        background_tasks.add_task(_run_full_tfidf)
+        job.wait()
+        state = job.to_dict()
         return RetrainResponse(
-            status="started",
-            details="Full TF-IDF retrain started in background",
-            samples_used=0
+            status=state["status"],
+            details=state["details"],
+            samples_used=state["metrics"].get("samples_used", 0),
+            job_id=job.id
         )
+    
+    if created:
+        details = f"{req.mode.capitalize()} TF-IDF retrain started in background"
+    else:
+        details = f"A {job.mode} retrain is already in progress; returning its job"
+    return RetrainResponse(
+        status="started" if created else "running",
+        details=details,
+        samples_used=0,
+        job_id=job.id
+    )
 
 @router.get("/retrain/status")
 def get_retrain_status() -> dict:
     
+    active = job_manager.active()
     return {
         "sync_mode": settings.RETRAIN_SYNC,
         "supported_models": ["tfidf"],
-        "supported_modes": ["full"],
+        "supported_modes": ["full", "incremental"],
+        "active_job": active.to_dict() if active else None,
+        "recent_jobs": job_manager.list(),
         "message": "Retrain endpoint is ready!"
     }
+
+@router.get("/retrain/{job_id}")
+def get_retrain_job(job_id: str) -> dict:
+    
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown retrain job: {job_id}")
+    return job.to_dict()
+
+@router.post("/retrain/{job_id}/cancel")
+def cancel_retrain_job(job_id: str) -> dict:
+    
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown retrain job: {job_id}")
+    if not job.cancel():
+        raise HTTPException(status_code=409, detail=f"Retrain job {job_id} already finished ({job.status})")
+    return {
+        **job.to_dict(),
+        "message": "Cancellation requested; the job stops at its next checkpoint"
+    }
@@ -0,0 +1,344 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.config import settings
+from ml.model_registry import write_json_atomic
+
+
+OUTPUT_COLUMNS = ("predicted_category", "confidence", "model_used")
+
+_adapter = None
+
+
+def _init_worker(torch_threads: int, tfidf_version: Optional[str]) -> None:
+
+    # Runs once per worker process: every chunk it scores reuses these models
+    global _adapter
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Before the models load, so the warm-up already runs at this width
+    if torch_threads > 0:
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+    # A backfill is scored by one model version from start to finish
+    settings.MODEL_CHECK_INTERVAL_S = 0
+
+    from backend.model_adapter import ModelAdapter
+    _adapter = ModelAdapter(load_models=True)
+
+    if tfidf_version and _adapter.get_model_versions()["tfidf"] != tfidf_version:
+        from ml.tfidf_pipeline import TfidfPipeline
+        pipeline = TfidfPipeline()
+        pipeline.load(settings.TFIDF_MODEL_DIR, version=tfidf_version)
+        _adapter.swap_tfidf_model(pipeline)
+
+
+def _score_chunk(texts: List[str], metas: Optional[List[Dict[str, Any]]]) -> Tuple[List[str], List[float], List[str]]:
+
+    results = _adapter.predict_batch(texts, metas)
+    return (
+        [r["label"] for r in results],
+        [round(float(r["confidence"]), 6) for r in results],
+        [r.get("model_used", "unknown") for r in results]
+    )
+
+
+def _input_format(path: str, fmt: Optional[str]) -> str:
+
+    if fmt:
+        return fmt
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def _read_csv_records(f: Any, n_records: int) -> bytes:
+
+    # Reads up to n_records complete CSV records as raw bytes. A record ends
+    # at a newline outside quotes; with "" as the escape for a quote, an even
+    # running quote count means we are outside a quoted field
+    lines = []
+    quotes = 0
+    records = 0
+    while records < n_records:
+        line = f.readline()
+        if not line:
+            break
+        lines.append(line)
+        if b'"' in line:
+            quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            records += 1
+    return b"".join(lines)
+
+
+def _iter_chunks(path: str, fmt: str, chunk_size: int, skip_rows: int, offset: Optional[int]) -> Iterator[Tuple[Any, Optional[int]]]:
+
+    # Streams the input as (chunk, input byte offset after it); only a window
+    # of chunks is ever held in memory
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet input needs pyarrow: pip install pyarrow")
+        parquet = pq.ParquetFile(path)
+        # Whole row groups before the resume point are skipped without decoding
+        row_groups = []
+        for i in range(parquet.num_row_groups):
+            n_rows = parquet.metadata.row_group(i).num_rows
+            if skip_rows >= n_rows:
+                skip_rows -= n_rows
+                continue
+            row_groups.append(i)
+        for batch in parquet.iter_batches(batch_size=chunk_size, row_groups=row_groups):
+            df = batch.to_pandas()
+            if skip_rows:
+                df, skip_rows = df.iloc[skip_rows:], 0
+            if len(df):
+                yield df, None
+        return
+
+    import io
+    import pandas as pd
+    with open(path, "rb") as f:
+        header = _read_csv_records(f, 1)
+        # A resumed run seeks straight to the first unscored record
+        if offset:
+            f.seek(offset)
+        while True:
+            body = _read_csv_records(f, chunk_size)
+            if not body:
+                return
+            # Everything stays a string, so passed-through columns are written back unchanged
+            df = pd.read_csv(io.BytesIO(header + body), dtype=str, keep_default_na=False)
+            if len(df):
+                yield df, f.tell()
+
+
+def _input_signature(path: str) -> Dict[str, Any]:
+
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class ScoreJob:
+
+    # Output is appended chunk by chunk in input order. After each chunk the
+    # output is fsynced and a checkpoint (rows done, output size) is written
+    # next to it; a resumed run truncates the output to the checkpointed size
+    # and seeks the input past the rows already scored.
+
+    def __init__(
+        self,
+        input_path: str,
+        output_path: str,
+        text_col: str = "transaction_text",
+        meta_cols: Optional[List[str]] = None,
+        keep_cols: Optional[List[str]] = None,
+        fmt: Optional[str] = None,
+        workers: int = 0,
+        chunk_size: int = 10000,
+        torch_threads: int = 1,
+        report_every_s: float = 10.0
+    ):
+
+        self.input_path = input_path
+        self.output_path = output_path
+        self.progress_path = output_path + ".progress.json"
+        self.text_col = text_col
+        self.meta_cols = meta_cols or []
+        self.keep_cols = keep_cols
+        self.fmt = _input_format(input_path, fmt)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.torch_threads = torch_threads
+        self.report_every_s = report_every_s
+
+    def _load_checkpoint(self, resume: bool, overwrite: bool) -> Dict[str, Any]:
+
+        signature = _input_signature(self.input_path)
+        if resume and os.path.exists(self.progress_path):
+            with open(self.progress_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint["input"] != os.path.abspath(self.input_path) or checkpoint["input_signature"] != signature:
+                raise SystemExit(f"{self.input_path} changed since {self.progress_path} was written; start over with --overwrite")
+            if checkpoint["text_col"] != self.text_col or checkpoint.get("keep_cols") != self.keep_cols:
+                raise SystemExit("Resume must use the same --text-col and --columns as the original run")
+            return checkpoint
+        if os.path.exists(self.output_path) and not overwrite:
+            raise SystemExit(f"{self.output_path} exists; pass --resume to continue it or --overwrite to replace it")
+
+        from ml.model_registry import ModelRegistry, RegistryError
+        try:
+            _, tfidf_version = ModelRegistry(settings.TFIDF_MODEL_DIR).resolve()
+        except RegistryError:
+            tfidf_version = None
+        return {
+            "input": os.path.abspath(self.input_path),
+            "input_signature": signature,
+            "text_col": self.text_col,
+            "keep_cols": self.keep_cols,
+            "tfidf_version": tfidf_version,
+            "rows_done": 0,
+            "input_offset": None,
+            "output_bytes": 0,
+            "complete": False,
+            "started_at": time.time()
+        }
+
+    def _output_frame(self, df: Any, scores: Tuple[List[str], List[float], List[str]]) -> Any:
+
+        out = df[self.keep_cols] if self.keep_cols is not None else df
+        out = out.copy()
+        for name, values in zip(OUTPUT_COLUMNS, scores):
+            out[name] = values
+        return out
+
+    def _chunk_inputs(self, df: Any) -> Tuple[List[str], Optional[List[Dict[str, Any]]]]:
+
+        if self.text_col not in df.columns:
+            raise SystemExit(f"Column '{self.text_col}' not found; columns are {list(df.columns)}")
+        texts = df[self.text_col].fillna("").astype(str).tolist()
+        metas = None
+        if self.meta_cols:
+            metas = [
+                {col: (value if value != "" else None) for col, value in zip(self.meta_cols, row)}
+                for row in df[self.meta_cols].itertuples(index=False, name=None)
+            ]
+        return texts, metas
+
+    def run(self, resume: bool = False, overwrite: bool = False) -> Dict[str, Any]:
+
+        checkpoint = self._load_checkpoint(resume, overwrite)
+        if checkpoint["complete"]:
+            print(f"ℹ {self.output_path} is already complete ({checkpoint['rows_done']} rows)")
+            return checkpoint
+
+        skip_rows = checkpoint["rows_done"]
+        if skip_rows:
+            if not os.path.exists(self.output_path):
+                raise SystemExit(f"{self.output_path} is missing; start over with --overwrite")
+            if self.fmt == "csv" and checkpoint.get("input_offset") is None:
+                raise SystemExit(f"{self.progress_path} has no input offset to resume from; start over with --overwrite")
+            print(f"ℹ Resuming after {skip_rows} rows")
+        output = open(self.output_path, "r+b" if skip_rows else "wb")
+        # Drop anything written after the last checkpoint
+        output.truncate(checkpoint["output_bytes"])
+        output.seek(checkpoint["output_bytes"])
+
+        ctx = multiprocessing.get_context("spawn")
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self.torch_threads, checkpoint["tfidf_version"])
+        )
+        print(f"ℹ Scoring {self.input_path} with {self.workers} workers, {self.chunk_size} rows per chunk "
+              f"(TF-IDF version {checkpoint['tfidf_version']})")
+
+        started = time.perf_counter()
+        last_report = started
+        scored = 0
+        window = []
+        max_in_flight = self.workers * 2
+
+        def write_next() -> None:
+            nonlocal scored, last_report
+            df, input_offset, future = window.pop(0)
+            out = self._output_frame(df, future.result())
+            out.to_csv(output, header=checkpoint["output_bytes"] == 0, index=False)
+            output.flush()
+            os.fsync(output.fileno())
+            scored += len(out)
+            checkpoint["rows_done"] += len(out)
+            checkpoint["input_offset"] = input_offset
+            checkpoint["output_bytes"] = output.tell()
+            checkpoint["updated_at"] = time.time()
+            write_json_atomic(self.progress_path, checkpoint)
+
+            now = time.perf_counter()
+            if now - last_report >= self.report_every_s:
+                last_report = now
+                print(f"  {checkpoint['rows_done']:,} rows scored, {scored / (now - started):,.0f} rows/sec")
+
+        # However the loop ends, the pool is torn down and the output closed;
+        # the checkpoint only ever covers fully written chunks, so a failed or
+        # interrupted run resumes cleanly
+        finished = False
+        try:
+            chunks = _iter_chunks(self.input_path, self.fmt, self.chunk_size, skip_rows, checkpoint["input_offset"])
+            for df, input_offset in chunks:
+                texts, metas = self._chunk_inputs(df)
+                window.append((df, input_offset, pool.submit(_score_chunk, texts, metas)))
+                # Results are written strictly in submission order; a bounded
+                # window keeps every worker busy without buffering the input
+                while len(window) >= max_in_flight or (window and window[0][2].done()):
+                    write_next()
+            while window:
+                write_next()
+            finished = True
+        except KeyboardInterrupt:
+            print(f"\n⚠ Interrupted after {checkpoint['rows_done']:,} rows; rerun with --resume to continue")
+            raise SystemExit(130)
+        except Exception as e:
+            print(f"⚠ Scoring failed after {checkpoint['rows_done']:,} rows ({e}); rerun with --resume to continue")
+            raise
+        finally:
+            pool.shutdown(wait=finished, cancel_futures=not finished)
+            output.close()
+
+        elapsed = time.perf_counter() - started
+        checkpoint["complete"] = True
+        checkpoint["elapsed_s"] = round(elapsed, 3)
+        checkpoint["rows_per_sec"] = round(scored / elapsed, 1) if elapsed > 0 else None
+        write_json_atomic(self.progress_path, checkpoint)
+        print(f"✓ Scored {scored:,} rows in {elapsed:.1f}s ({checkpoint['rows_per_sec']:,} rows/sec); "
+              f"{checkpoint['rows_done']:,} rows in {self.output_path}")
+        return checkpoint
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Score a large CSV or Parquet file with the CalcBERT models")
+    parser.add_argument("input", help="CSV or Parquet file to score")
+    parser.add_argument("output", help="CSV file to write; input columns plus " + ", ".join(OUTPUT_COLUMNS))
+    parser.add_argument("--text-col", default="transaction_text")
+    parser.add_argument("--meta-cols", default="", help="Comma-separated columns passed to the rules as meta")
+    parser.add_argument("--columns", default=None, help="Comma-separated input columns to copy to the output (default: all)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None, help="Input format (default: from the extension)")
+    parser.add_argument("--workers", type=int, default=0, help="Scoring processes (0 = one per CPU core)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per chunk sent to a worker")
+    parser.add_argument("--torch-threads", type=int, default=settings.TORCH_THREADS_PER_WORKER,
+                        help="torch intra-op threads per worker")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between progress lines")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint")
+    parser.add_argument("--overwrite", action="store_true", help="Replace an existing output file")
+    args = parser.parse_args()
+
+    job = ScoreJob(
+        args.input,
+        args.output,
+        text_col=args.text_col,
+        meta_cols=[c for c in args.meta_cols.split(",") if c],
+        keep_cols=[c for c in args.columns.split(",") if c] if args.columns else None,
+        fmt=args.format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        torch_threads=args.torch_threads,
+        report_every_s=args.report_every
+    )
+    job.run(resume=args.resume, overwrite=args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
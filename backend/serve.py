@@ -0,0 +1,144 @@
+import os
+import gc
+import sys
+import time
+import socket
+import signal
+import argparse
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.config import settings
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _limit_torch_threads(n_threads: int) -> None:
+
+    # N workers each running a full-width torch pool would oversubscribe the node
+    torch = sys.modules.get("torch")
+    if torch is not None and n_threads > 0:
+        torch.set_num_threads(n_threads)
+
+
+def _run_worker(app, adapter, sock: socket.socket, log_level: str, torch_threads: int) -> None:
+
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _limit_torch_threads(torch_threads)
+    # The first DistilBERT forward pass happens here, after the fork and the
+    # thread limit, and before this worker accepts connections
+    if adapter is not None:
+        adapter.warm_up_distil()
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info", torch_threads: int = 1) -> None:
+
+    if not hasattr(os, "fork"):
+        import uvicorn
+        print("⚠ os.fork not available on this platform; starting a single worker without model sharing")
+        uvicorn.run("backend.app:app", host=host, port=port, log_level=log_level)
+        return
+
+    # Importing the app builds the ModelAdapter in the master, before forking,
+    # so every worker maps the same vectorizer / classifier / DistilBERT pages
+    # copy-on-write instead of loading its own copy.
+    started = time.time()
+    from backend.app import app
+    from backend.routes import predict
+    # Load synchronously here: a background loader thread would not survive
+    # the fork, and the point is to share the loaded pages. DistilBERT is not
+    # run in the master, so workers don't inherit a started torch thread pool
+    if predict.adapter is not None:
+        predict.adapter.load_models(warm_distil=False)
+    print(f"✓ Application and models loaded in master in {time.time() - started:.1f}s")
+
+    sock = _bind_socket(host, port)
+
+    # Move everything allocated so far out of the collector's generations so
+    # GC passes in the workers do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(app, predict.adapter, sock, log_level, torch_threads)
+            finally:
+                os._exit(0)
+        children[pid] = time.time()
+        print(f"✓ Worker {pid} started")
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        spawn()
+    print(f"Serving on http://{host}:{port} with {workers} workers (master pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started_at = children.pop(pid, None)
+        if started_at is None or stopping:
+            continue
+        print(f"⚠ Worker {pid} exited with status {status}; restarting")
+        # Avoid a hot restart loop when a worker dies right after starting
+        if time.time() - started_at < 1.0:
+            time.sleep(1.0)
+        spawn()
+
+    sock.close()
+    print("CalcBERT server stopped")
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker server for the CalcBERT backend")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS,
+                        help="Number of worker processes (0 = one per CPU core)")
+    parser.add_argument("--torch-threads", type=int, default=settings.TORCH_THREADS_PER_WORKER,
+                        help="torch intra-op threads per worker")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    serve(args.host, args.port, workers, args.log_level, args.torch_threads)
+
+
+if __name__ == "__main__":
+    main()
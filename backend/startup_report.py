@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+from typing import List, Tuple
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _import_times(module: str) -> List[Tuple[str, int, int]]:
+
+    # -X importtime writes "import time: self [us] | cumulative | name" to stderr
+    env = dict(os.environ, BACKGROUND_MODEL_LOAD="true")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            # Nesting is shown by indentation after the single separator space
+            rows.append((parts[2][1:], int(parts[0]), int(parts[1])))
+        except ValueError:
+            continue
+    return rows
+
+
+def report(module: str = "backend.app", top: int = 15, load_models: bool = True) -> None:
+
+    rows = _import_times(module)
+    top_level = [r for r in rows if not r[0].startswith(" ")]
+    total_us = sum(r[2] for r in top_level)
+
+    print("=" * 60)
+    print(f"Import of {module}: {total_us / 1e6:.2f}s")
+    print("=" * 60)
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[:top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name.strip()}")
+
+    if load_models:
+        from backend.model_adapter import ModelAdapter
+        started = time.perf_counter()
+        adapter = ModelAdapter(load_models=True)
+        elapsed = time.perf_counter() - started
+        print("=" * 60)
+        print(f"Model load: {elapsed:.2f}s")
+        print("=" * 60)
+        for name, state in adapter.model_state.items():
+            took = adapter.load_timings.get(name)
+            took = f"{took:.2f}s" if took is not None else "-"
+            print(f"{name:<12} {state:<10} {took}")
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Show where CalcBERT backend startup time goes")
+    parser.add_argument("--module", default="backend.app", help="Module whose import is profiled")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument("--no-models", action="store_true", help="Skip timing the model load")
+    args = parser.parse_args()
+
+    report(args.module, args.top, load_models=not args.no_models)
+
+
+if __name__ == "__main__":
+    main()
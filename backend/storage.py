@@ -1,88 +1,414 @@
 import sqlite3
+import math
 import time
-from typing import List, Tuple, Optional
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple, Optional
 import os
 
-DB_PATH = "backend/backend_feedback.db"
+from backend.config import settings
+from backend.concurrency import ProcessLocal
+
+
+def _db_path_from_url(url: str) -> str:
+    
+    # Accepts sqlite:///path and sqlite+aiosqlite:///path (four slashes = absolute)
+    scheme, sep, path = url.partition(":///")
+    if not sep or not scheme.startswith("sqlite"):
+        raise ValueError(f"Unsupported DB_URL '{url}': only sqlite URLs are supported")
+    return path or ":memory:"
+
+
+DB_PATH = _db_path_from_url(settings.DB_URL)
+
+
+INSERT_FEEDBACK = "INSERT INTO feedback (text, correct_label, user_id, created_at) VALUES (?, ?, ?, ?)"
+SELECT_SAMPLES = "SELECT id, text, correct_label FROM feedback ORDER BY id ASC"
+SELECT_SAMPLES_LIMIT = SELECT_SAMPLES + " LIMIT ?"
+SELECT_SAMPLES_AFTER = "SELECT id, text, correct_label FROM feedback WHERE id > ? ORDER BY id ASC"
+SELECT_SAMPLES_AFTER_LIMIT = SELECT_SAMPLES_AFTER + " LIMIT ?"
+SELECT_MAX_ID = "SELECT COALESCE(MAX(id), 0) FROM feedback"
+LAST_ROWID = "SELECT last_insert_rowid()"
+SELECT_COUNT = "SELECT COUNT(*) FROM feedback"
+DELETE_ALL = "DELETE FROM feedback"
+SELECT_RECENT = (
+    "SELECT id, text, correct_label, created_at FROM feedback WHERE created_at >= ? ORDER BY created_at DESC"
+)
+
+# Aggregated view: one row per (normalized text, label) with its vote count,
+# folded in from the raw table up to the "aggregated_id" watermark
+UPSERT_AGG = (
+    "INSERT INTO feedback_agg (norm_text, label, votes, last_id) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (norm_text, label) DO UPDATE SET "
+    "votes = votes + excluded.votes, last_id = MAX(last_id, excluded.last_id)"
+)
+# Majority label per text (latest correction breaks ties), its votes and the total
+SELECT_AGG_WINNERS = """
+SELECT norm_text, label, votes, total, last_id FROM (
+    SELECT norm_text, label, votes, last_id,
+           SUM(votes) OVER (PARTITION BY norm_text) AS total,
+           ROW_NUMBER() OVER (PARTITION BY norm_text ORDER BY votes DESC, last_id DESC) AS rank
+    FROM feedback_agg
+) WHERE rank = 1 AND votes >= ?
+"""
+SELECT_AGG_COUNTS = "SELECT COUNT(DISTINCT norm_text), COUNT(*), COALESCE(SUM(votes), 0) FROM feedback_agg"
+SELECT_STATE = "SELECT value FROM feedback_state WHERE key = ?"
+UPSERT_STATE = (
+    "INSERT INTO feedback_state (key, value) VALUES (?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+)
+DELETE_COMPACTED = (
+    "DELETE FROM feedback WHERE id IN "
+    "(SELECT id FROM feedback WHERE id <= ? AND created_at < ? ORDER BY id LIMIT ?)"
+)
+DELETE_AGG = "DELETE FROM feedback_agg"
+DELETE_STATE = "DELETE FROM feedback_state"
+
+AGGREGATED_ID = "aggregated_id"
+
+
+class ConnectionPool:
+
+    # One persistent connection per thread. sqlite3 keeps a per-connection
+    # cache of prepared statements keyed on the SQL text, so reusing the
+    # connection and the constant statements above skips both connection
+    # setup and re-parsing. The thread-locals are a ProcessLocal, so a forked
+    # worker opens its own connections.
+
+    def __init__(self, path: str, cached_statements: int = 128):
+        
+        self.path = path
+        self.cached_statements = cached_statements
+        self._local: ProcessLocal[threading.local] = ProcessLocal(threading.local, on_fork=self._forget_inherited)
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._opened = 0
+
+    def _forget_inherited(self) -> None:
+        
+        # Inherited connections belong to the parent; drop them unclosed
+        self._connections = []
+
+    def _connect(self) -> sqlite3.Connection:
+        
+        conn = sqlite3.connect(
+            self.path,
+            timeout=settings.DB_BUSY_TIMEOUT_S,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        # WAL lets readers run alongside the single writer, and with
+        # synchronous=NORMAL a commit no longer fsyncs (only checkpoints do)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={settings.DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size=-{int(settings.DB_CACHE_SIZE_KB)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={int(settings.DB_BUSY_TIMEOUT_S * 1000)}")
+        return conn
+
+    def get(self) -> sqlite3.Connection:
+        
+        local = self._local.get()
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+                self._opened += 1
+        return conn
+
+    def close_all(self) -> None:
+        
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def get_stats(self) -> dict:
+        
+        with self._lock:
+            return {"path": self.path, "open_connections": len(self._connections), "opened_total": self._opened}
+
+
+_pool = ConnectionPool(DB_PATH)
+
+# Dedicated threads for the async API so database waits never block the
+# event loop or take slots from the prediction executor
+_executor: ProcessLocal[ThreadPoolExecutor] = ProcessLocal(
+    lambda: ThreadPoolExecutor(max_workers=settings.DB_POOL_SIZE, thread_name_prefix="storage")
+)
+
+
+async def _run_async(fn: Callable[..., Any], *args: Any) -> Any:
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor.get(), fn, *args)
 
 
 def init_db() -> None:
     
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS feedback (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        text TEXT NOT NULL,
-        correct_label TEXT NOT NULL,
-        user_id TEXT,
-        created_at INTEGER NOT NULL
-    )
-    """)
-    conn.commit()
-    conn.close()
+    directory = os.path.dirname(DB_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = _pool.get()
+    with conn:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            correct_label TEXT NOT NULL,
+            user_id TEXT,
+            created_at INTEGER NOT NULL
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_created_at ON feedback (created_at)")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback_agg (
+            norm_text TEXT NOT NULL,
+            label TEXT NOT NULL,
+            votes INTEGER NOT NULL,
+            last_id INTEGER NOT NULL,
+            PRIMARY KEY (norm_text, label)
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback_state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        """)
     print(f"Database initialized at {DB_PATH}")
 
 
+def close_db() -> None:
+    
+    executor = _executor.clear()
+    if executor is not None:
+        executor.shutdown(wait=True)
+    _pool.close_all()
+
+
+def get_db_stats() -> dict:
+    
+    return _pool.get_stats()
+
+
 def save_feedback(text: str, correct_label: str, user_id: Optional[str] = None) -> int:
     
     ts = int(time.time())
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO feedback (text, correct_label, user_id, created_at) VALUES (?, ?, ?, ?)",
-        (text, correct_label, user_id, ts)
-    )
-    fid = c.lastrowid
-    conn.commit()
-    conn.close()
-    return fid
-
-
-def get_feedback_samples(limit: Optional[int] = None) -> List[Tuple[int, str, str]]:
-    
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    q = "SELECT id, text, correct_label FROM feedback ORDER BY created_at ASC"
+    conn = _pool.get()
+    with conn:
+        cur = conn.execute(INSERT_FEEDBACK, (text, correct_label, user_id, ts))
+    return cur.lastrowid
+
+
+def save_feedback_many(rows: List[Tuple[str, str, Optional[str]]]) -> List[int]:
+    
+    # One transaction for the whole chunk. BEGIN IMMEDIATE takes the write lock
+    # up front, so the AUTOINCREMENT ids of the chunk are consecutive and can
+    # be recovered from the last one
+    if not rows:
+        return []
+    ts = int(time.time())
+    conn = _pool.get()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(INSERT_FEEDBACK, [(text, label, user_id, ts) for text, label, user_id in rows])
+        last_id = conn.execute(LAST_ROWID).fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+def get_feedback_samples(limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Tuple[int, str, str]]:
+    
+    # after_id reads only rows newer than an already-applied id, in id order
+    conn = _pool.get()
+    if after_id is not None:
+        if limit:
+            return conn.execute(SELECT_SAMPLES_AFTER_LIMIT, (int(after_id), int(limit))).fetchall()
+        return conn.execute(SELECT_SAMPLES_AFTER, (int(after_id),)).fetchall()
     if limit:
-        q += f" LIMIT {limit}"
-    c.execute(q)
-    rows = c.fetchall()
-    conn.close()
-    return rows
+        return conn.execute(SELECT_SAMPLES_LIMIT, (int(limit),)).fetchall()
+    return conn.execute(SELECT_SAMPLES).fetchall()
+
+
+def get_max_feedback_id() -> int:
+    
+    return _pool.get().execute(SELECT_MAX_ID).fetchone()[0]
 
 
 def get_feedback_count() -> int:
     
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT COUNT(*) FROM feedback")
-    count = c.fetchone()[0]
-    conn.close()
-    return count
+    return _pool.get().execute(SELECT_COUNT).fetchone()[0]
 
 
 def clear_feedback() -> None:
     
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM feedback")
-    conn.commit()
-    conn.close()
+    conn = _pool.get()
+    with conn:
+        conn.execute(DELETE_ALL)
+        conn.execute(DELETE_AGG)
+        conn.execute(DELETE_STATE)
     print("All feedback cleared from database")
 
 
 def get_recent_feedback(hours: int = 24) -> List[Tuple[int, str, str, int]]:
     
     cutoff = int(time.time()) - (hours * 3600)
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT id, text, correct_label, created_at FROM feedback WHERE created_at >= ? ORDER BY created_at DESC",
-        (cutoff,)
-    )
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    return _pool.get().execute(SELECT_RECENT, (cutoff,)).fetchall()
+
+
+def _get_state(conn: sqlite3.Connection, key: str) -> int:
+    
+    row = conn.execute(SELECT_STATE, (key,)).fetchone()
+    return row[0] if row else 0
+
+
+def feedback_weight(votes: int, max_weight: float = 0.0) -> float:
+    
+    # Sublinear in the vote count, so one text corrected thousands of times
+    # cannot dominate the fit; max_weight > 0 caps it further
+    weight = 1.0 + math.log(max(1, votes))
+    return min(weight, max_weight) if max_weight > 0 else weight
+
+
+def collapse_feedback(
+    rows: List[Tuple[int, str, str]],
+    max_weight: float = 0.0
+) -> List[Tuple[str, str, float]]:
+    
+    # (id, text, label) rows -> one (normalized text, majority label, weight)
+    # per distinct text; the latest correction wins a tie. Weight comes from
+    # the winning label's vote count (see feedback_weight)
+    from ml.data_pipeline import normalize_text
+    votes: Dict[str, Counter] = {}
+    latest: Dict[Tuple[str, str], int] = {}
+    for fid, text, label in rows:
+        norm = normalize_text(text)
+        votes.setdefault(norm, Counter())[label] += 1
+        latest[(norm, label)] = fid
+    collapsed = []
+    for norm, counts in votes.items():
+        label, n = max(counts.items(), key=lambda item: (item[1], latest[(norm, item[0])]))
+        collapsed.append((norm, label, feedback_weight(n, max_weight)))
+    return collapsed
+
+
+def aggregate_feedback(chunk_size: int = 50000) -> int:
+    
+    # Folds raw rows newer than the watermark into feedback_agg. Each chunk
+    # and its watermark move commit together, so a row is counted exactly once
+    conn = _pool.get()
+    from ml.data_pipeline import normalize_text
+    folded = 0
+    while True:
+        after_id = _get_state(conn, AGGREGATED_ID)
+        rows = conn.execute(SELECT_SAMPLES_AFTER_LIMIT, (after_id, chunk_size)).fetchall()
+        if not rows:
+            return folded
+        counts: Counter = Counter()
+        last_ids: Dict[Tuple[str, str], int] = {}
+        for fid, text, label in rows:
+            key = (normalize_text(text), label)
+            counts[key] += 1
+            last_ids[key] = fid
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if _get_state(conn, AGGREGATED_ID) != after_id:
+                # Another worker folded this chunk first
+                continue
+            conn.executemany(UPSERT_AGG, [(norm, label, n, last_ids[(norm, label)]) for (norm, label), n in counts.items()])
+            conn.execute(UPSERT_STATE, (AGGREGATED_ID, rows[-1][0]))
+        folded += len(rows)
+
+
+def get_aggregated_feedback(min_votes: int = 1, max_weight: float = 0.0) -> Tuple[List[Tuple[str, str, float]], int]:
+    
+    # Training view: (normalized text, majority label, weight) per distinct
+    # text, plus the raw id it is complete up to
+    aggregate_feedback()
+    conn = _pool.get()
+    watermark = _get_state(conn, AGGREGATED_ID)
+    rows = conn.execute(SELECT_AGG_WINNERS, (int(min_votes),)).fetchall()
+    samples = [(norm, label, feedback_weight(votes, max_weight)) for norm, label, votes, _, _ in rows]
+    return samples, watermark
+
+
+def compact_feedback(older_than_s: float, keep_after_id: Optional[int] = None, chunk_size: int = 10000) -> int:
+    
+    # Deletes raw rows that are already folded into feedback_agg and older than
+    # the cutoff. keep_after_id protects rows a consumer (the live model's
+    # incremental watermark) has not read yet. Deleted in chunks so writers
+    # are not locked out for the whole compaction
+    conn = _pool.get()
+    aggregate_feedback()
+    up_to = _get_state(conn, AGGREGATED_ID)
+    if keep_after_id is not None:
+        up_to = min(up_to, int(keep_after_id))
+    cutoff = int(time.time() - older_than_s)
+    deleted = 0
+    while True:
+        with conn:
+            cur = conn.execute(DELETE_COMPACTED, (up_to, cutoff, chunk_size))
+        deleted += cur.rowcount
+        if cur.rowcount < chunk_size:
+            return deleted
+
+
+def get_feedback_summary() -> Dict[str, int]:
+    
+    conn = _pool.get()
+    texts, pairs, votes = conn.execute(SELECT_AGG_COUNTS).fetchone()
+    return {
+        "raw_rows": conn.execute(SELECT_COUNT).fetchone()[0],
+        "max_id": conn.execute(SELECT_MAX_ID).fetchone()[0],
+        "aggregated_id": _get_state(conn, AGGREGATED_ID),
+        "distinct_texts": texts,
+        "text_label_pairs": pairs,
+        "aggregated_votes": votes
+    }
+
+
+async def save_feedback_async(text: str, correct_label: str, user_id: Optional[str] = None) -> int:
+    
+    return await _run_async(save_feedback, text, correct_label, user_id)
+
+
+async def save_feedback_many_async(rows: List[Tuple[str, str, Optional[str]]]) -> List[int]:
+    
+    return await _run_async(save_feedback_many, rows)
+
+
+async def get_feedback_samples_async(
+    limit: Optional[int] = None,
+    after_id: Optional[int] = None
+) -> List[Tuple[int, str, str]]:
+    
+    return await _run_async(get_feedback_samples, limit, after_id)
+
+
+async def get_feedback_count_async() -> int:
+    
+    return await _run_async(get_feedback_count)
+
+
+async def get_recent_feedback_async(hours: int = 24) -> List[Tuple[int, str, str, int]]:
+    
+    return await _run_async(get_recent_feedback, hours)
+
+
+async def compact_feedback_async(older_than_s: float, keep_after_id: Optional[int] = None) -> int:
+    
+    return await _run_async(compact_feedback, older_than_s, keep_after_id)
+
+
+async def get_feedback_summary_async() -> Dict[str, int]:
+    
+    return await _run_async(get_feedback_summary)
@@ -0,0 +1,193 @@
+import os
+import sys
+import time
+import queue
+import traceback
+import multiprocessing
+from typing import Any, Callable, Dict, Optional
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.config import settings
+from backend.retrain_jobs import RetrainJob, JobCancelled
+
+
+BASE_DATASET = "data/train.csv"
+
+ProgressFn = Callable[..., None]
+
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def train_full_tfidf(report: ProgressFn) -> Dict[str, Any]:
+
+    # Fits on the base dataset plus all feedback and publishes the result as an
+    # inactive registry version; activating and swapping it in is the caller's job
+    from ml.tfidf_pipeline import TfidfPipeline
+    from ml.data_pipeline import normalize_text
+    from ml.model_registry import ModelRegistry
+    from ml.corpus_cache import load_normalized_corpus
+    from backend.storage import get_feedback_samples, get_aggregated_feedback, get_max_feedback_id
+
+    if not os.path.exists(BASE_DATASET):
+        return {
+            "status": "error",
+            "details": f"Base dataset not found at {BASE_DATASET}",
+            "samples_used": 0
+        }
+
+    # The base rows come pre-normalized from the corpus cache, so only the
+    # feedback is normalized on each retrain
+    if settings.CORPUS_CACHE_ENABLED:
+        base_texts, base_labels, corpus = load_normalized_corpus(BASE_DATASET, settings.CORPUS_CACHE_DIR)
+    else:
+        import pandas as pd
+        started = time.perf_counter()
+        base_df = pd.read_csv(BASE_DATASET)
+        base_texts = base_df["transaction_text"].map(normalize_text).tolist()
+        base_labels = base_df["category"].tolist()
+        corpus = {"cache": "disabled", "rows": len(base_texts), "seconds": round(time.perf_counter() - started, 3)}
+    print(f"ℹ Base corpus: {corpus['rows']} rows in {corpus['seconds']}s (cache {corpus['cache']})")
+
+    # Aggregated feedback is one weighted row per distinct normalized text, so
+    # repeated corrections add weight instead of duplicate rows
+    if settings.FEEDBACK_AGGREGATE:
+        feedback, watermark = get_aggregated_feedback(settings.FEEDBACK_MIN_VOTES, settings.FEEDBACK_MAX_WEIGHT)
+    else:
+        watermark = get_max_feedback_id()
+        feedback = [(normalize_text(text), label, 1.0) for fid, text, label in get_feedback_samples() if fid <= watermark]
+    feedback_count = len(feedback)
+    report(progress=0.15)
+
+    texts = base_texts + [norm for norm, _, _ in feedback]
+    labels = base_labels + [label for _, label, _ in feedback]
+    weights = [1.0] * len(base_texts) + [weight for _, _, weight in feedback]
+
+    unique_categories = sorted(set(labels))
+    base_categories = sorted(set(base_labels))
+
+    if len(unique_categories) < len(base_categories):
+        print(f"WARNING: Combined dataset has {len(unique_categories)} categories but base had {len(base_categories)}")
+        print(f"Base categories: {base_categories}")
+        print(f"Combined categories: {unique_categories}")
+
+    report("training", 0.25)
+    train_started = time.perf_counter()
+    pipeline = TfidfPipeline(hashing=settings.TFIDF_HASHING, n_features=settings.TFIDF_HASH_FEATURES)
+    pipeline.fit(texts, labels, sample_weight=weights)
+    train_seconds = time.perf_counter() - train_started
+    # Everything up to here is in the model; incremental updates continue after it
+    pipeline.feedback_watermark = watermark
+
+    report("saving", 0.85)
+    version = ModelRegistry(settings.TFIDF_MODEL_DIR).publish(pipeline, metadata={
+        "mode": "full",
+        "samples_used": len(texts),
+        "feedback_used": feedback_count,
+        "feedback_watermark": pipeline.feedback_watermark,
+        "train_seconds": round(train_seconds, 3)
+    }, activate=False)
+
+    return {
+        "status": "complete",
+        "details": (
+            f"Full TF-IDF retrain completed (model version {version}): {len(base_texts)} base samples + "
+            f"{feedback_count} feedback samples = {len(texts)} total"
+        ),
+        "model_version": version,
+        "samples_used": len(texts),
+        "feedback_used": feedback_count,
+        "train_seconds": round(train_seconds, 3),
+        "corpus_cache": corpus["cache"],
+        "corpus_load_seconds": corpus["seconds"],
+        "categories_trained": len(pipeline.classes),
+        "base_categories_count": len(base_categories)
+    }
+
+
+def _limit_resources(nice: int, cpu_limit: int) -> Dict[str, Any]:
+
+    # Runs first thing in the trainer process, before numpy/sklearn are
+    # imported, so the BLAS/OpenMP pools are sized from the env vars
+    applied: Dict[str, Any] = {"pid": os.getpid()}
+    if nice > 0 and hasattr(os, "nice"):
+        try:
+            applied["nice"] = os.nice(nice)
+        except OSError as e:
+            print(f"⚠ Trainer could not lower its priority: {e}")
+    if cpu_limit > 0:
+        for var in _THREAD_ENV_VARS:
+            os.environ[var] = str(cpu_limit)
+        if hasattr(os, "sched_setaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+            # The highest-numbered CPUs, leaving the low ones to the API workers
+            if len(cpus) > cpu_limit:
+                os.sched_setaffinity(0, cpus[-cpu_limit:])
+            applied["cpus"] = sorted(os.sched_getaffinity(0))
+    return applied
+
+
+def _trainer_main(messages: "multiprocessing.Queue", nice: int, cpu_limit: int) -> None:
+
+    try:
+        limits = _limit_resources(nice, cpu_limit)
+        result = train_full_tfidf(lambda phase=None, progress=None: messages.put(("progress", phase, progress)))
+        result["trainer"] = limits
+        messages.put(("result", result, None))
+    except BaseException as e:
+        messages.put(("error", f"{e}\n{traceback.format_exc()}", None))
+
+
+def run_full_tfidf_out_of_process(job: RetrainJob, poll_interval_s: float = 0.2) -> Dict[str, Any]:
+
+    # A spawned process has its own interpreter and GIL, so fitting never takes
+    # CPU time slices or the GIL from request threads. spawn rather than fork:
+    # the API process holds threads, sqlite connections and loaded models.
+    ctx = multiprocessing.get_context("spawn")
+    messages = ctx.Queue()
+    process = ctx.Process(
+        target=_trainer_main,
+        args=(messages, settings.RETRAIN_NICE, settings.RETRAIN_CPU_LIMIT),
+        name=f"trainer-{job.id}",
+        daemon=True
+    )
+    process.start()
+    print(f"ℹ Retrain job {job.id} training in process {process.pid}")
+
+    try:
+        while True:
+            try:
+                kind, payload, progress = messages.get(timeout=poll_interval_s)
+            except queue.Empty:
+                job.check_cancelled()
+                if not process.is_alive():
+                    return {
+                        "status": "error",
+                        "details": f"Trainer process exited with code {process.exitcode} before finishing",
+                        "samples_used": 0
+                    }
+                continue
+            if kind == "progress":
+                job.update(payload, progress)
+            elif kind == "result":
+                return payload
+            else:
+                return {"status": "error", "details": f"Retrain failed: {payload}", "samples_used": 0}
+    except JobCancelled:
+        # Nothing is activated until the caller swaps, so killing the
+        # trainer at any point leaves the serving model untouched
+        process.terminate()
+        raise
+    finally:
+        process.join(timeout=5.0)
+        messages.close()
+
+
+def run_full_tfidf(job: RetrainJob, out_of_process: Optional[bool] = None) -> Dict[str, Any]:
+
+    if out_of_process is None:
+        out_of_process = settings.RETRAIN_OUT_OF_PROCESS
+    if out_of_process:
+        return run_full_tfidf_out_of_process(job)
+    return train_full_tfidf(job.update)
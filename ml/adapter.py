@@ -1,4 +1,5 @@
 from ml.tfidf_pipeline import TfidfPipeline
+from ml.model_registry import ModelRegistry
 from ml.data_pipeline import normalize_text
 import pandas as pd
 import json
@@ -84,7 +85,7 @@ def retrain_from_feedback():
     labels = combined["category"].tolist()
 
     model.fit(texts, labels)
-    model.save(MODEL_DIR)
+    ModelRegistry(MODEL_DIR).publish(model, metadata={"mode": "full", "feedback_used": feedback_count})
 
     
     global _model
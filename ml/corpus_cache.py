@@ -0,0 +1,96 @@
+import os
+import time
+import uuid
+
+import numpy as np
+
+from ml.data_pipeline import normalize_series, get_map_version
+from ml.model_registry import sha256_file
+
+# Bump when normalize_text changes in a way the alias map version doesn't capture
+NORMALIZER_VERSION = 1
+
+DEFAULT_CACHE_DIR = "data/cache"
+
+
+def _cache_path(cache_dir, csv_path, source_hash, map_version):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{source_hash[:16]}-{map_version}-n{NORMALIZER_VERSION}.npz")
+
+
+def _pack(texts, labels):
+    # Normalized text never contains a newline, so the corpus is stored as one
+    # utf8 blob plus label codes: no pickled object arrays, loads with one split
+    classes, codes = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    blob = np.frombuffer("\n".join(texts).encode("utf8"), dtype=np.uint8)
+    return {
+        "texts": blob,
+        "n_rows": np.array([len(texts)]),
+        "classes": classes,
+        "codes": codes.astype(np.int32)
+    }
+
+
+def _unpack(data):
+    n_rows = int(data["n_rows"][0])
+    texts = data["texts"].tobytes().decode("utf8").split("\n") if n_rows else []
+    if len(texts) != n_rows:
+        raise ValueError(f"corpus cache holds {len(texts)} texts, expected {n_rows}")
+    classes = data["classes"].tolist()
+    labels = [classes[c] for c in data["codes"]]
+    return texts, labels
+
+
+def _save(path, arrays):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def _remove_stale(cache_dir, csv_path, keep):
+    # Entries for older versions of the same source file or map
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith(stem + "-") and name.endswith(".npz") and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def load_normalized_corpus(csv_path, cache_dir=DEFAULT_CACHE_DIR, text_col="transaction_text", label_col="category"):
+    # Normalized texts and labels of a training CSV. The cache key is the file's
+    # content hash plus the alias map version, so an edited dataset or map
+    # rebuilds it and nothing else does
+    started = time.perf_counter()
+    source_hash = sha256_file(csv_path)
+    map_version = get_map_version()
+    path = _cache_path(cache_dir, csv_path, source_hash, map_version)
+
+    if os.path.exists(path):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                texts, labels = _unpack(data)
+            return texts, labels, {
+                "cache": "hit", "path": path, "rows": len(texts),
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠ Corpus cache {path} unreadable, rebuilding: {e}")
+
+    import pandas as pd
+    df = pd.read_csv(csv_path, usecols=[text_col, label_col])
+    texts = normalize_series(df[text_col]).tolist()
+    labels = df[label_col].astype(str).tolist()
+    try:
+        _save(path, _pack(texts, labels))
+        _remove_stale(cache_dir, csv_path, path)
+    except OSError as e:
+        print(f"⚠ Could not write corpus cache {path}: {e}")
+    return texts, labels, {
+        "cache": "miss", "path": path, "rows": len(texts),
+        "seconds": round(time.perf_counter() - started, 3)
+    }
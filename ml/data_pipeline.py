@@ -1,27 +1,168 @@
 import re
+import os
 import json
-import pandas as pd
+import time
+import hashlib
+import threading
+from collections import deque
 
-NORMALIZE_MAP_PATH = "ml/maps.json"
+NORMALIZE_MAP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps.json")
+MAP_CHECK_INTERVAL = 2.0
 
-def _load_map():
-    with open(NORMALIZE_MAP_PATH, "r", encoding="utf8") as f:
-        return json.load(f)
+_CLEAN_RE = re.compile(r"[^a-z0-9\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class AliasNormalizer:
+    # Aho-Corasick automaton over the alias keys. Keys are applied in the same
+    # order as the original loop (longest first, ties in map order), but instead
+    # of testing every key against the text, one linear scan finds the first key
+    # in that order that actually occurs. After a replacement the text is
+    # rescanned for later keys only, which reproduces the sequential
+    # replace-in-order semantics exactly.
+
+    def __init__(self, mapping, version=None):
+        self.mapping = mapping
+        self.version = version
+        self.keys = sorted(mapping.keys(), key=lambda x: -len(x))
+
+        goto = [{}]
+        outputs = [[]]
+        for order, key in enumerate(self.keys):
+            node = 0
+            for ch in key:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                node = nxt
+            outputs[node].append(order)
+
+        fail = [0] * len(goto)
+        bfs = deque(goto[0].values())
+        while bfs:
+            node = bfs.popleft()
+            for ch, nxt in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                outputs[nxt].extend(outputs[fail[nxt]])
+                bfs.append(nxt)
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(sorted(set(o))) for o in outputs]
+
+    def _first_present(self, text, after):
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        best = None
+        node = 0
+        for ch in text:
+            nxt = goto[node].get(ch)
+            while nxt is None and node:
+                node = fail[node]
+                nxt = goto[node].get(ch)
+            node = nxt or 0
+            for order in outputs[node]:
+                if order > after:
+                    if best is None or order < best:
+                        best = order
+                    break
+        return best
+
+    def apply(self, text):
+        after = -1
+        while True:
+            order = self._first_present(text, after)
+            if order is None:
+                return text
+            key = self.keys[order]
+            text = text.replace(key, self.mapping[key])
+            after = order
+
+
+def _read_map_file():
+    with open(NORMALIZE_MAP_PATH, "rb") as f:
+        raw = f.read()
+    return json.loads(raw.decode("utf8")), hashlib.sha1(raw).hexdigest()[:12]
+
+
+def _file_signature():
+    try:
+        st = os.stat(NORMALIZE_MAP_PATH)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+_reload_lock = threading.Lock()
+_signature = None
+_normalizer = None
+_last_check = time.monotonic()
+
+# Populated on first use rather than at import so importing this module (and
+# everything that imports it) stays cheap
+NORMALIZE_MAP = None
+
+
+def _get_normalizer():
+    if _normalizer is None:
+        reload_map(force=True)
+        if _normalizer is None:
+            raise RuntimeError(f"Alias map could not be loaded from {NORMALIZE_MAP_PATH}")
+    return _normalizer
+
+
+def reload_map(force=False):
+    # Builds the new automaton off to the side and swaps it in with a single
+    # assignment, so concurrent normalize_text calls see either the old or the
+    # new map, never a half-built one. A map file caught mid-write fails to
+    # parse and leaves the current automaton in place.
+    global _normalizer, _signature, NORMALIZE_MAP
+    with _reload_lock:
+        signature = _file_signature()
+        if not force and signature == _signature:
+            return False
+        try:
+            mapping, version = _read_map_file()
+        except (OSError, ValueError) as e:
+            print(f"⚠ Alias map reload failed, keeping current map: {e}")
+            return False
+        _normalizer = AliasNormalizer(mapping, version)
+        NORMALIZE_MAP = mapping
+        _signature = signature
+        return True
+
+
+def _maybe_reload():
+    global _last_check
+    now = time.monotonic()
+    if now - _last_check < MAP_CHECK_INTERVAL:
+        return
+    _last_check = now
+    if _file_signature() != _signature:
+        reload_map()
+
+
+def get_map_version():
+    _maybe_reload()
+    return _get_normalizer().version
 
-NORMALIZE_MAP = _load_map()
 
 def normalize_text(text: str) -> str:
     if text is None:
         return ""
+    _maybe_reload()
     t = text.lower()
-    t = re.sub(r"[^a-z0-9\s]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-
-    for k in sorted(NORMALIZE_MAP.keys(), key=lambda x: -len(x)):
-        if k in t:
-            t = t.replace(k, NORMALIZE_MAP[k])
+    t = _CLEAN_RE.sub(" ", t)
+    t = _SPACE_RE.sub(" ", t).strip()
 
-    return t
+    return _get_normalizer().apply(t)
 
-def normalize_series(series: pd.Series) -> pd.Series:
+def normalize_series(series):
+    # Takes a pandas Series; pandas itself is only needed by the callers
     return series.fillna("").astype(str).map(normalize_text)
@@ -1,43 +1,195 @@
+import threading
 import torch
+import numpy as np
 from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
 import json, os
 from ml.explain import explain_distilbert
 
+BACKENDS = ("torch", "quantized", "onnx", "onnx-int8")
+ONNX_FILES = {"onnx": "model.onnx", "onnx-int8": "model.int8.onnx"}
+
+
+def _softmax(logits):
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
 class DistilBertWrapper:
-    def __init__(self, model_dir="saved_models/distilbert", device="cpu"):
+    def __init__(self, model_dir="saved_models/distilbert", device="cpu", backend="torch",
+                 bucket_by_length=True, batch_size=32, max_length=64):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown DistilBERT backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        self.bucket_by_length = bucket_by_length
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "forward_passes": 0, "sequences": 0,
+                       "real_tokens": 0, "padded_tokens": 0, "unbucketed_padded_tokens": 0}
         self.device = torch.device(device)
         self.tokenizer = DistilBertTokenizerFast.from_pretrained(model_dir)
-        self.model = DistilBertForSequenceClassification.from_pretrained(model_dir).to(self.device)
         with open(os.path.join(model_dir, "label_map.json")) as f:
             self.label_map = json.load(f)
 
-    def predict(self, texts, top_k=3):
-        self.model.eval()
-        enc = self.tokenizer(texts, padding=True, truncation=True, max_length=64, return_tensors='pt')
-        # Send everything to device
-        enc = {k: v.to(self.device) for k, v in enc.items()}
+        self.model = None
+        self.session = None
+        if backend in ONNX_FILES:
+            self.session = self._load_onnx(os.path.join(model_dir, ONNX_FILES[backend]))
+        else:
+            self.model = DistilBertForSequenceClassification.from_pretrained(model_dir).to(self.device)
+            self.model.eval()
+            if backend == "quantized":
+                # int8 weights for every Linear layer; activations stay fp32
+                self.model = torch.quantization.quantize_dynamic(
+                    self.model.to("cpu"), {torch.nn.Linear}, dtype=torch.qint8
+                )
+                self.device = torch.device("cpu")
+
+    def _load_onnx(self, path):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("onnxruntime is required for the ONNX DistilBERT backend: pip install onnxruntime")
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"{path} not found; export it with: python -m ml.export_distilbert --model-dir {os.path.dirname(path)}"
+            )
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.intra_op_num_threads = torch.get_num_threads()
+        return ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+    def _forward(self, input_ids, attention_mask, output_attentions=False):
+        # Returns (logits, cls_attention); cls_attention is the last layer's
+        # [CLS] attention over the sequence, averaged across heads, or None
+        if self.session is not None:
+            logits = self.session.run(["logits"], {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+            return logits, None
+
         with torch.no_grad():
-            out = self.model(**enc)
-        probs = torch.nn.functional.softmax(out.logits, dim=-1).cpu().numpy()
+            out = self.model(
+                input_ids=torch.from_numpy(input_ids).to(self.device),
+                attention_mask=torch.from_numpy(attention_mask).to(self.device),
+                output_attentions=output_attentions,
+            )
+        cls_attention = None
+        if output_attentions and out.attentions:
+            cls_attention = out.attentions[-1][:, :, 0, :].mean(dim=1).cpu().numpy()
+        return out.logits.cpu().numpy(), cls_attention
+
+    def _logits(self, texts, explain=False, top_k=3):
+        # Tokenize once without padding, then pad per sub-batch. With bucketing
+        # the inputs are sorted by token length so each sub-batch only pads to
+        # its own longest member; results are scattered back to input order.
+        ids = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)["input_ids"]
+        n = len(ids)
+        lengths = np.fromiter((len(x) for x in ids), dtype=np.int64, count=n)
+        if self.bucket_by_length:
+            order = np.argsort(lengths, kind="stable")
+            step = self.batch_size
+        else:
+            order = np.arange(n)
+            step = max(n, 1)
+
+        pad_id = self.tokenizer.pad_token_id or 0
+        logits = None
+        attributions = [[] for _ in range(n)] if explain else None
+        real = padded = passes = 0
+        for start in range(0, n, step):
+            idx = order[start:start + step]
+            width = int(lengths[idx].max())
+            input_ids = np.full((len(idx), width), pad_id, dtype=np.int64)
+            attention_mask = np.zeros((len(idx), width), dtype=np.int64)
+            for row, i in enumerate(idx):
+                length = lengths[i]
+                input_ids[row, :length] = ids[i]
+                attention_mask[row, :length] = 1
+            out, cls_attention = self._forward(input_ids, attention_mask, output_attentions=explain)
+            if logits is None:
+                logits = np.empty((n, out.shape[1]), dtype=out.dtype)
+            logits[idx] = out
+            if explain and cls_attention is not None:
+                for row, i in enumerate(idx):
+                    attributions[i] = explain_distilbert(
+                        self.tokenizer, ids[i], cls_attention[row, :lengths[i]], top_k=top_k
+                    )
+            real += int(lengths[idx].sum())
+            padded += len(idx) * width
+            passes += 1
+
+        with self._stats_lock:
+            self._stats["calls"] += 1
+            self._stats["forward_passes"] += passes
+            self._stats["sequences"] += n
+            self._stats["real_tokens"] += real
+            self._stats["padded_tokens"] += padded
+            self._stats["unbucketed_padded_tokens"] += n * int(lengths.max()) if n else 0
+        return logits, attributions
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["bucket_by_length"] = self.bucket_by_length
+        stats["batch_size"] = self.batch_size
+        # Share of computed positions that are real tokens, with the current
+        # batching and with the single pad-to-longest batch it replaces
+        stats["padding_efficiency"] = (
+            round(stats["real_tokens"] / stats["padded_tokens"], 4) if stats["padded_tokens"] else None
+        )
+        stats["unbucketed_padding_efficiency"] = (
+            round(stats["real_tokens"] / stats["unbucketed_padded_tokens"], 4)
+            if stats["unbucketed_padded_tokens"] else None
+        )
+        return stats
+
+    def predict(self, texts, top_k=3, explain=False):
+        if len(texts) == 0:
+            return []
+        logits, attributions = self._logits(texts, explain=explain, top_k=top_k)
+        probs = _softmax(logits)
         results = []
         for i, p in enumerate(probs):
             idx = int(p.argmax())
             label = self.label_map[str(idx)] if str(idx) in self.label_map else str(idx)
-            # Optionally: integrate explainability here
             results.append({
                 "label": label,
                 "confidence": float(p.max()),
                 "probs": {self.label_map[str(j)]: float(p[j]) for j in range(len(p))},
-                "raw_logits": out.logits[i].cpu().tolist(),
-                "top_tokens": explain_distilbert(texts[i], self, top_k=top_k)
+                "raw_logits": logits[i].tolist(),
+                "top_tokens": attributions[i] if attributions is not None else []
             })
         return results
 
+    def export_onnx(self, out_path, opset=14):
+        if self.model is None or self.backend != "torch":
+            raise ValueError("ONNX export needs the fp32 torch backend")
+        dummy = self.tokenizer(["export sample"], padding=True, return_tensors='pt')
+        dummy = {k: v.to(self.device) for k, v in dummy.items()}
+        torch.onnx.export(
+            self.model,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            out_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=opset,
+        )
+        return out_path
+
     def save(self, out_dir):
+        if self.model is None or self.backend != "torch":
+            raise ValueError("Only the fp32 torch backend can be saved; export other backends from it")
         self.tokenizer.save_pretrained(out_dir)
         self.model.save_pretrained(out_dir)
         with open(os.path.join(out_dir, "label_map.json"), "w") as f:
             json.dump(self.label_map, f)
 
     def load(self, model_dir):
-        return DistilBertWrapper(model_dir=model_dir, device=str(self.device))
+        return DistilBertWrapper(model_dir=model_dir, device=str(self.device), backend=self.backend,
+                                 bucket_by_length=self.bucket_by_length, batch_size=self.batch_size,
+                                 max_length=self.max_length)
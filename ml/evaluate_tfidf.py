@@ -14,7 +14,7 @@ def evaluate(model_dir="saved_models/tfidf", test_csv="data/test.csv"):
     p = TfidfPipeline()
     p.load(model_dir)
 
-    preds = [r["label"] for r in p.predict(texts)]
+    preds = p.predict_arrays(texts)[0].tolist()
     report = classification_report(labels, preds, output_dict=True)
 
     # save metrics
@@ -22,10 +22,10 @@ def evaluate(model_dir="saved_models/tfidf", test_csv="data/test.csv"):
         json.dump(report, f, indent=2)
 
     # confusion matrix
-    cm = confusion_matrix(labels, preds, labels=p.le.classes_)
+    cm = confusion_matrix(labels, preds, labels=p.classes)
     plt.figure(figsize=(10, 7))
-    sns.heatmap(cm, annot=True, fmt="d", xticklabels=p.le.classes_,
-                yticklabels=p.le.classes_)
+    sns.heatmap(cm, annot=True, fmt="d", xticklabels=p.classes,
+                yticklabels=p.classes)
     plt.savefig("metrics/confusion_tfidf.png")
 
     print(" Metrics saved.")
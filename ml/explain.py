@@ -1,3 +1,11 @@
-def explain_distilbert(text, model_wrapper, top_k=3):
-    tokens = model_wrapper.tokenizer.tokenize(text)
-    return [{"token": t, "score": round(1/top_k, 2)} for t in tokens[:top_k]]
+def explain_distilbert(tokenizer, input_ids, scores, top_k=3):
+    # scores: one attribution per position of input_ids, taken from the batch
+    # forward pass; special tokens are dropped and the rest renormalised
+    special = set(tokenizer.all_special_ids)
+    tokens = tokenizer.convert_ids_to_tokens(list(input_ids))
+    kept = [(t, float(s)) for t, i, s in zip(tokens, input_ids, scores) if i not in special]
+    total = sum(s for _, s in kept)
+    if not kept or total <= 0:
+        return []
+    kept.sort(key=lambda x: -x[1])
+    return [{"token": t, "score": round(s / total, 4)} for t, s in kept[:top_k]]
@@ -0,0 +1,85 @@
+import os
+import time
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from ml.data_pipeline import normalize_series
+from ml.distilbert_model import DistilBertWrapper, ONNX_FILES
+
+
+def export(model_dir="saved_models/distilbert", quantize=True):
+    fp32 = DistilBertWrapper(model_dir, backend="torch")
+    onnx_path = os.path.join(model_dir, ONNX_FILES["onnx"])
+    fp32.export_onnx(onnx_path)
+    print("ONNX model saved to:", onnx_path)
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        int8_path = os.path.join(model_dir, ONNX_FILES["onnx-int8"])
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+        print("Quantized ONNX model saved to:", int8_path)
+
+
+def _score(model, texts, batch_size):
+    labels, times = [], []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        t0 = time.perf_counter()
+        labels.extend(r["label"] for r in model.predict(batch))
+        times.append(time.perf_counter() - t0)
+    return labels, times
+
+
+def check_parity(model_dir="saved_models/distilbert", test_csv="data/test.csv",
+                 backends=("quantized", "onnx", "onnx-int8"), batch_size=32, limit=None):
+    df = pd.read_csv(test_csv)
+    if limit:
+        df = df.head(limit)
+    texts = normalize_series(df["transaction_text"]).tolist()
+    gold = df["category"].astype(str).tolist()
+
+    reference = DistilBertWrapper(model_dir, backend="torch")
+    ref_labels, ref_times = _score(reference, texts, batch_size)
+    ref_ms = float(np.mean(ref_times)) * 1000
+    report = {
+        "torch": {
+            "accuracy": float(np.mean([p == g for p, g in zip(ref_labels, gold)])),
+            "ms_per_batch": round(ref_ms, 2),
+        }
+    }
+
+    for backend in backends:
+        try:
+            model = DistilBertWrapper(model_dir, backend=backend)
+        except Exception as e:
+            report[backend] = {"error": str(e)}
+            continue
+        labels, times = _score(model, texts, batch_size)
+        ms = float(np.mean(times)) * 1000
+        report[backend] = {
+            "accuracy": float(np.mean([p == g for p, g in zip(labels, gold)])),
+            "agreement_with_torch": float(np.mean([p == r for p, r in zip(labels, ref_labels)])),
+            "ms_per_batch": round(ms, 2),
+            "speedup_vs_torch": round(ref_ms / ms, 2) if ms else None,
+        }
+
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export DistilBERT to ONNX / int8 and check parity with fp32")
+    parser.add_argument("--model-dir", default="saved_models/distilbert")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 ONNX model")
+    parser.add_argument("--skip-export", action="store_true", help="Only run the parity check")
+    parser.add_argument("--check", default="data/test.csv", help="Test CSV for the accuracy-parity check ('' to skip)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--limit", type=int, default=None, help="Only check the first N test rows")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export(args.model_dir, quantize=not args.no_quantize)
+    if args.check:
+        backends = ("quantized", "onnx") if args.no_quantize else ("quantized", "onnx", "onnx-int8")
+        check_parity(args.model_dir, args.check, backends, args.batch_size, args.limit)
@@ -1,5 +1,6 @@
 import json
 from ml.tfidf_pipeline import TfidfPipeline
+from ml.model_registry import ModelRegistry
 from ml.data_pipeline import normalize_text
 
 def ingest_feedback(path="data/feedback.json"):
@@ -23,7 +24,9 @@ def apply_incremental_update(pipeline: TfidfPipeline, samples, save_dir="saved_m
     
     updated_count = pipeline.partial_fit(list(texts), list(labels))
     if updated_count > 0:
-        pipeline.save(save_dir)
+        pipeline.version = ModelRegistry(save_dir).publish(
+            pipeline, metadata={"mode": "incremental", "base_version": pipeline.version, "samples_used": updated_count}
+        )
     
     return updated_count
 
@@ -1,10 +1,20 @@
+RULE_HIGH_CONF = 0.9
+TFIDF_HIGH_CONF = 0.10
+
+
+def rule_is_decisive(rule_output):
+    return bool(rule_output) and rule_output.get("confidence", 0) >= RULE_HIGH_CONF
+
+
+def tfidf_is_decisive(tfidf_output):
+    return bool(tfidf_output) and tfidf_output.get("confidence", 0) >= TFIDF_HIGH_CONF
+
+
 def fuse(rule_output, ml_output, tfidf_output, weights=None):
     
     weights = weights or {"rule": 0.6, "ml": 0.3, "tfidf": 0.1}
-    RULE_HIGH_CONF = 0.9
-    TFIDF_HIGH_CONF = 0.10  
     
-    if rule_output and rule_output.get("confidence", 0) >= RULE_HIGH_CONF:
+    if rule_is_decisive(rule_output):
         final = rule_output.copy()
         final["model_used"] = "rule"
         final["rationale"] = {
@@ -16,7 +26,7 @@ def fuse(rule_output, ml_output, tfidf_output, weights=None):
         return final
 
     
-    if tfidf_output and tfidf_output.get("confidence", 0) >= TFIDF_HIGH_CONF:
+    if tfidf_is_decisive(tfidf_output):
         final = tfidf_output.copy()
         final["model_used"] = "tfidf"
         final["rationale"] = {
@@ -40,3 +50,32 @@ def fuse(rule_output, ml_output, tfidf_output, weights=None):
         return final
 
     return rule_output or {"label": "Unknown", "confidence": 0.0, "rationale": {}, "model_used": "none"}
+
+
+def fuse_cascade(rule_outputs, run_tfidf, run_ml, weights=None):
+    # Pulls model outputs only for the rows fuse() would still look at:
+    # TF-IDF for rows without a decisive rule, the ML model for rows where
+    # TF-IDF is not decisive either. Each runner is called at most once with
+    # the indices it has to score and returns outputs in that order (or None).
+    n = len(rule_outputs)
+    tfidf_outputs = [None] * n
+    ml_outputs = [None] * n
+
+    pending = [i for i, r in enumerate(rule_outputs) if not rule_is_decisive(r)]
+    if pending:
+        outs = run_tfidf(pending)
+        if outs is not None:
+            for i, out in zip(pending, outs):
+                tfidf_outputs[i] = out
+
+    pending = [i for i in pending if not tfidf_is_decisive(tfidf_outputs[i])]
+    if pending:
+        outs = run_ml(pending)
+        if outs is not None:
+            for i, out in zip(pending, outs):
+                ml_outputs[i] = out
+
+    return [
+        fuse(rule_outputs[i], ml_outputs[i], tfidf_outputs[i], weights)
+        for i in range(n)
+    ]
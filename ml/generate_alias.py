@@ -1,5 +1,6 @@
 import pandas as pd
 import json
+import os
 import re
 from collections import defaultdict
 from fuzzywuzzy import fuzz
@@ -63,8 +64,12 @@ def generate_map(csv_path="data/GHCI_clean.csv"):
             if alias != canonical:
                 normalize_map[alias] = canonical
 
-    with open("ml/maps.json", "w") as f:
+    # Write to a temp file and rename so a running normalizer never reads a
+    # half-written map
+    tmp_path = "ml/maps.json.tmp"
+    with open(tmp_path, "w") as f:
         json.dump(normalize_map, f, indent=2)
+    os.replace(tmp_path, "ml/maps.json")
 
     print("Generated maps.json with", len(normalize_map), "entries.")
 
@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import hashlib
+
+POINTER_FILE = "current.json"
+MANIFEST_FILE = "manifest.json"
+VERSIONS_DIR = "versions"
+# What publish() generates; anything else (e.g. "../x" from an API call) is
+# never joined into a path
+VERSION_RE = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{6}$")
+
+
+class RegistryError(Exception):
+    pass
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_json_atomic(path, data):
+    # Readers see either the old file or the new one, never a partial write
+    tmp = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    # Versioned model store:
+    #
+    #   <root>/versions/<version>/   immutable artifacts + manifest.json (sha256 per file)
+    #   <root>/current.json          {"version": ..., "history": [...]}, replaced atomically
+    #
+    # A version directory is fully written under a temporary name and renamed
+    # into place, so a reader never sees half a version; switching versions is
+    # one os.replace of the pointer file. Roots that still hold a single
+    # unversioned model (the pre-registry layout) load as version "legacy".
+
+    def __init__(self, root):
+        self.root = root
+        self.versions_dir = os.path.join(root, VERSIONS_DIR)
+        self.pointer_path = os.path.join(root, POINTER_FILE)
+
+    def _version_path(self, version):
+        if not isinstance(version, str) or not VERSION_RE.match(version):
+            raise RegistryError(f"Unknown model version: {version}")
+        return os.path.join(self.versions_dir, version)
+
+    def _read_pointer(self):
+        try:
+            with open(self.pointer_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def current_version(self):
+        pointer = self._read_pointer()
+        return pointer["version"] if pointer else None
+
+    def pointer_signature(self):
+        # Cheap change check for workers polling for a new current version
+        try:
+            st = os.stat(self.pointer_path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            return None
+
+    def publish(self, pipeline, metadata=None, activate=True):
+        os.makedirs(self.versions_dir, exist_ok=True)
+        version = time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        tmp_path = os.path.join(self.versions_dir, f".tmp-{version}")
+        try:
+            pipeline.save(tmp_path)
+            files = {
+                name: sha256_file(os.path.join(tmp_path, name))
+                for name in sorted(os.listdir(tmp_path))
+            }
+            manifest = {
+                "version": version,
+                "created_at": time.time(),
+                "files": files,
+                "metadata": metadata or {}
+            }
+            write_json_atomic(os.path.join(tmp_path, MANIFEST_FILE), manifest)
+            os.replace(tmp_path, self._version_path(version))
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        if activate:
+            self.set_current(version)
+        return version
+
+    def manifest(self, version):
+        path = os.path.join(self._version_path(version), MANIFEST_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise RegistryError(f"Unknown model version: {version}")
+
+    def verify(self, version):
+        manifest = self.manifest(version)
+        path = self._version_path(version)
+        for name, digest in manifest["files"].items():
+            file_path = os.path.join(path, name)
+            if not os.path.exists(file_path):
+                raise RegistryError(f"Model version {version} is missing {name}")
+            if sha256_file(file_path) != digest:
+                raise RegistryError(f"Checksum mismatch for {name} in model version {version}")
+        return manifest
+
+    def set_current(self, version):
+        self.verify(version)
+        pointer = self._read_pointer() or {"history": []}
+        history = [v for v in pointer.get("history", []) if v != version]
+        history.append(version)
+        write_json_atomic(self.pointer_path, {
+            "version": version,
+            "previous": pointer.get("version"),
+            "updated_at": time.time(),
+            "history": history[-50:]
+        })
+        return version
+
+    def rollback(self, version=None):
+        # Default target: the version that was current before this one
+        pointer = self._read_pointer()
+        if pointer is None:
+            raise RegistryError("No current model version to roll back from")
+        if version is None:
+            history = [v for v in pointer.get("history", []) if v != pointer["version"]]
+            history = [v for v in history if VERSION_RE.match(v) and os.path.isdir(self._version_path(v))]
+            if not history:
+                raise RegistryError("No previous model version to roll back to")
+            version = history[-1]
+        return self.set_current(version)
+
+    def list_versions(self):
+        current = self.current_version()
+        versions = []
+        if os.path.isdir(self.versions_dir):
+            for name in sorted(os.listdir(self.versions_dir)):
+                if not VERSION_RE.match(name):
+                    continue
+                try:
+                    manifest = self.manifest(name)
+                except RegistryError:
+                    continue
+                versions.append({
+                    "version": name,
+                    "created_at": manifest.get("created_at"),
+                    "metadata": manifest.get("metadata", {}),
+                    "current": name == current
+                })
+        # Oldest first; names only order to the second
+        versions.sort(key=lambda v: v["created_at"] or 0)
+        return versions
+
+    def min_metadata(self, key, default=0):
+        # Lowest metadata value across retained versions (None if there are
+        # none); a version without the key counts as `default`
+        values = [v["metadata"].get(key, default) for v in self.list_versions()]
+        return min(values) if values else None
+
+    def resolve(self, version=None):
+        # Returns (path, version) of the artifacts to load
+        version = version or self.current_version()
+        if version is None:
+            if os.path.exists(os.path.join(self.root, "model.pkl")):
+                # An unversioned root, or a version directory loaded directly
+                manifest_path = os.path.join(self.root, MANIFEST_FILE)
+                if os.path.exists(manifest_path):
+                    with open(manifest_path) as f:
+                        return self.root, json.load(f)["version"]
+                return self.root, "legacy"
+            raise RegistryError(f"No model found in {self.root}")
+        self.verify(version)
+        return self._version_path(version), version
+
+    def prune(self, keep=10):
+        # Drops the oldest versions beyond `keep`, never the current or previous one
+        pointer = self._read_pointer() or {}
+        protected = {pointer.get("version"), pointer.get("previous")}
+        versions = [v["version"] for v in self.list_versions()]
+        removed = []
+        for version in versions[:max(0, len(versions) - keep)]:
+            if version not in protected:
+                shutil.rmtree(self._version_path(version), ignore_errors=True)
+                removed.append(version)
+        return removed
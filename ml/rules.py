@@ -76,31 +76,148 @@ RULES = {
 }
 
 
+_WORD_RE = re.compile(r"\w+")
+_KEYWORD_PATTERN_RE = re.compile(r"^\\b(\w+)(\?)?\\b$")
+_LITERAL_PREFIX_RE = re.compile(r"^(?:\\b)?([a-z0-9 ]+)(?![?*{])")
+
+
+def _keyword_forms(pattern: str) -> Optional[List[str]]:
+    
+    # r"\bword\b" matches exactly when "word" is a whole \w+ run of the
+    # text, so such patterns become plain dictionary lookups; r"\bwords?\b"
+    # expands to both spellings.
+    m = _KEYWORD_PATTERN_RE.match(pattern)
+    if not m:
+        return None
+    word = m.group(1).lower()
+    if m.group(2):
+        return [word[:-1], word]
+    return [word]
+
+
+class RuleEngine:
+    
+    
+    def __init__(self, rules: Dict[str, List[str]]):
+        
+        self.categories = list(rules.keys())
+        
+        self.patterns: List[str] = []
+        index: Dict[str, int] = {}
+        self.category_patterns: Dict[str, List[int]] = {}
+        for category, patterns in rules.items():
+            ids = []
+            for pattern in patterns:
+                if pattern not in index:
+                    index[pattern] = len(self.patterns)
+                    self.patterns.append(pattern)
+                if index[pattern] not in ids:
+                    ids.append(index[pattern])
+            self.category_patterns[category] = ids
+        
+        self.display = [p.replace(r"\b", "").replace("?", "") for p in self.patterns]
+        
+        self._keywords: Dict[str, List[int]] = {}
+        complex_ids = []
+        for i, pattern in enumerate(self.patterns):
+            forms = _keyword_forms(pattern)
+            if forms is None:
+                complex_ids.append(i)
+                continue
+            for form in forms:
+                self._keywords.setdefault(form, []).append(i)
+        
+        # Everything else is searched on its own (a shared alternation would
+        # lose overlapping matches and break patterns with their own groups),
+        # skipped when its literal prefix does not occur in the text
+        self._complex = []
+        for i in complex_ids:
+            m = _LITERAL_PREFIX_RE.match(self.patterns[i].lower())
+            prefix = m.group(1) if m and "|" not in self.patterns[i] else ""
+            self._complex.append((i, prefix if prefix.strip() else None, re.compile(self.patterns[i], re.IGNORECASE)))
+    
+    def match(self, text: str) -> Dict[str, List[str]]:
+        
+        if not text:
+            return {}
+        
+        text_lower = text.lower()
+        hit_ids = set()
+        keywords = self._keywords
+        for word in _WORD_RE.findall(text_lower):
+            ids = keywords.get(word)
+            if ids:
+                hit_ids.update(ids)
+        
+        for i, prefix, rx in self._complex:
+            if i not in hit_ids and (prefix is None or prefix in text_lower) and rx.search(text_lower):
+                hit_ids.add(i)
+        
+        if not hit_ids:
+            return {}
+        
+        hits = {}
+        for category in self.categories:
+            matches = [self.display[i] for i in self.category_patterns[category] if i in hit_ids]
+            if matches:
+                hits[category] = matches
+        return hits
+    
+    def match_batch(self, texts: List[str]) -> List[Dict[str, List[str]]]:
+        
+        return [self.match(text) for text in texts]
+
+
+_ENGINE: Optional[RuleEngine] = None
+RULES_VERSION = 0
+
+
+def get_engine() -> RuleEngine:
+    
+    global _ENGINE
+    engine = _ENGINE
+    if engine is None:
+        engine = RuleEngine(RULES)
+        _ENGINE = engine
+    return engine
+
+
+def _to_rule_output(hits: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+    
+    if not hits:
+        return None
+    
+    # First category in RULES order wins, as before; all hits are kept
+    category = next(iter(hits))
+    return {
+        "label": category,
+        "confidence": 0.95,
+        "matches": hits[category],
+        "category_hits": hits,
+        "source": "rule-based"
+    }
+
+
+def match_rules(text: str) -> Dict[str, List[str]]:
+    
+    return get_engine().match(text)
+
+
 def apply_rules(text: str, meta: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
    
     if not text:
         return None
     
-    text_lower = text.lower()
-    
-    # Check each category's rules
-    for category, patterns in RULES.items():
-        matches = []
-        for pattern in patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                matches.append(pattern.replace(r"\b", "").replace("?", ""))
-        
-        if matches:
-            # High confidence if rule matched
-            return {
-                "label": category,
-                "confidence": 0.95,
-                "matches": matches,
-                "source": "rule-based"
-            }
+    return _to_rule_output(get_engine().match(text))
+
+
+def apply_rules_batch(
+    texts: List[str],
+    metas: Optional[List[Optional[Dict[str, Any]]]] = None
+) -> List[Optional[Dict[str, Any]]]:
     
-    # No rule matched
-    return None
+    engine = get_engine()
+    return [_to_rule_output(hits) for hits in engine.match_batch(texts)]
 
 
 def get_all_categories() -> List[str]:
@@ -110,6 +227,39 @@ def get_all_categories() -> List[str]:
 
 def add_rule(category: str, pattern: str) -> None:
     
+    global _ENGINE, RULES_VERSION
     if category not in RULES:
         RULES[category] = []
     RULES[category].append(pattern)
+    _ENGINE = None
+    RULES_VERSION += 1
+
+
+def _check_engine() -> None:
+    
+    # Regression check: the engine must report exactly what searching every
+    # pattern on its own reports, including overlapping and same-position hits
+    rules = {category: list(patterns) for category, patterns in RULES.items()}
+    rules["Misc"] = [r"\bgas", r"(sta)(tion)\b", r"\b(\w)\1\w*", r"\bshell\s*gas"]
+    engine = RuleEngine(rules)
+    texts = [
+        "gas station", "Shell gas 42", "starbucks coffee", "uber to the airport",
+        "whole foods market", "look at the cinema", "subway sandwich", "zz top", "", "x"
+    ]
+    for text in texts:
+        expected = {}
+        for category, patterns in rules.items():
+            hits = []
+            for pattern in patterns:
+                display = pattern.replace(r"\b", "").replace("?", "")
+                if re.search(pattern, text.lower(), re.IGNORECASE) and display not in hits:
+                    hits.append(display)
+            if hits:
+                expected[category] = hits
+        got = engine.match(text)
+        assert got == expected, f"{text!r}: {got} != {expected}"
+    print(f"✓ Rule engine matches per-pattern search on {len(texts)} texts")
+
+
+if __name__ == "__main__":
+    _check_engine()
@@ -1,23 +1,131 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.linear_model import SGDClassifier
-from sklearn.preprocessing import LabelEncoder
+from sklearn.preprocessing import LabelEncoder, normalize
+import scipy.sparse as sp
 import joblib
+import json
 import os
 import numpy as np
 from scipy.special import expit 
 
+
+class _HashedFeatureNames:
+    # Stand-in for get_feature_names_out() on a hashed feature space: maps a
+    # column back to the last token seen hashing there
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def __getitem__(self, index):
+        return self.tokens.get(int(index), f"#{int(index)}")
+
+
+class RunningTfidfVectorizer:
+    # TF-IDF over a fixed hashed feature space. Unlike TfidfVectorizer the
+    # columns never change, so new vocabulary needs no refit, and the IDF is
+    # kept as running document frequencies that partial_fit keeps updating.
+    # Weighting matches TfidfVectorizer's defaults (smooth idf, l2 norm).
+
+    def __init__(self, n_features=2 ** 18):
+        self.n_features = n_features
+        self.hasher = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        self.n_docs = 0
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.tokens = {}
+        self._token_set = set()
+        self._idf = None
+
+    def __setstate__(self, state):
+        # Pickles from before the token set existed
+        self.__dict__.update(state)
+        if "_token_set" not in state:
+            self._token_set = set(self.tokens.values())
+
+    def partial_fit(self, texts):
+        counts = self.hasher.transform(texts)
+        self.n_docs += counts.shape[0]
+        self.df += np.bincount(counts.indices, minlength=self.n_features)
+        self._idf = None
+
+        analyzer = self.hasher.build_analyzer()
+        new_tokens = {tok for text in texts for tok in analyzer(text)} - self._token_set
+        if new_tokens:
+            self._token_set |= new_tokens
+            new_tokens = sorted(new_tokens)
+            hashed = self.hasher.transform(new_tokens).tocsr()
+            for row, tok in enumerate(new_tokens):
+                cols = hashed.indices[hashed.indptr[row]:hashed.indptr[row + 1]]
+                if len(cols):
+                    self.tokens[int(cols[0])] = tok
+        return self
+
+    def fit(self, texts):
+        self.n_docs = 0
+        self.df = np.zeros(self.n_features, dtype=np.int64)
+        self.tokens = {}
+        self._token_set = set()
+        return self.partial_fit(texts)
+
+    def fit_transform(self, texts):
+        return self.fit(texts).transform(texts)
+
+    def transform(self, texts):
+        if self._idf is None:
+            self._idf = np.log((1.0 + self.n_docs) / (1.0 + self.df)) + 1.0
+        X = self.hasher.transform(texts).astype(np.float64)
+        X = X @ sp.diags(self._idf)
+        return normalize(X.tocsr(), norm="l2", copy=False)
+
+    def get_feature_names_out(self):
+        return _HashedFeatureNames(self.tokens)
+
+
 class TfidfPipeline:
-    def __init__(self, max_features=5000):
-        self.vectorizer = TfidfVectorizer(max_features=max_features)
+    def __init__(self, max_features=5000, hashing=False, n_features=2 ** 18):
+        # hashing=True gives a stable feature space that partial_fit can keep
+        # extending with new vocabulary; the default is the original frozen
+        # TfidfVectorizer
+        if hashing:
+            self.vectorizer = RunningTfidfVectorizer(n_features=n_features)
+        else:
+            self.vectorizer = TfidfVectorizer(max_features=max_features)
         self.clf = SGDClassifier(loss="log_loss", max_iter=1000)
         self.le = LabelEncoder()
+        self._set_labels([])
         self._is_fitted = False
+        # Highest feedback row id already learned from
+        self.feedback_watermark = 0
+        # Registry version this model was loaded from, if any
+        self.version = None
+
+    @property
+    def incremental(self):
+        return isinstance(self.vectorizer, RunningTfidfVectorizer)
 
-    def fit(self, texts, labels):
+    @property
+    def classes(self):
+        # Label names in encoded order: the fitted encoder's sorted classes,
+        # then any added later by partial_fit
+        return self._labels
+
+    def _set_labels(self, labels):
+        # The LabelEncoder stays as fitted (its classes_ must remain sorted for
+        # transform); labels added after the fit only extend this index
+        self._labels = np.asarray(labels)
+        self._label_index = {label: i for i, label in enumerate(self._labels.tolist())}
+
+    def _encode(self, labels):
+        try:
+            return np.array([self._label_index[label] for label in labels], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e}")
+
+    def fit(self, texts, labels, sample_weight=None):
         X = self.vectorizer.fit_transform(texts)
         y = self.le.fit_transform(labels)
-        self.clf.fit(X, y)
+        self._set_labels(self.le.classes_)
+        self.clf.fit(X, y, sample_weight=sample_weight)
         self._is_fitted = True
+        self._refresh_class_names()
 
     def _get_probs(self, X):
         if hasattr(self.clf, "predict_proba"):
@@ -29,56 +137,180 @@ class TfidfPipeline:
                 probs = np.vstack([1-probs, probs]).T
             probs = probs / probs.sum(axis=1, keepdims=True)
             return probs
-        n = len(self.le.classes_)
+        n = len(self._labels)
         return np.ones((X.shape[0], n)) / n
 
-    def predict(self, texts):
+    def _refresh_class_names(self):
+        # Probability columns follow clf.classes_ (encoded ints); map them to
+        # label names once instead of per row
+        self._class_names = self._labels[np.asarray(self.clf.classes_)]
+        self._class_list = self._class_names.tolist()
+
+        # Token explanations: feature index -> token, and one coefficient row
+        # per probability column (binary models store a single row for class 1)
+        self._vocab = self.vectorizer.get_feature_names_out()
+        coef = np.asarray(self.clf.coef_)
+        self._class_coef = np.vstack([-coef[0], coef[0]]) if coef.shape[0] == 1 else coef
+
+    def _scores(self, texts):
         if not self._is_fitted:
             raise ValueError("Model not fitted or loaded.")
         X = self.vectorizer.transform(texts)
         probs = self._get_probs(X)
-        preds = self.clf.predict(X)
-
-        results = []
-        for i, p in enumerate(preds):
-            label = self.le.inverse_transform([p])[0]
-            prob = float(probs[i].max())
-            probs_map = {
-                self.le.inverse_transform([j])[0]: float(probs[i][j])
-                for j in range(len(self.le.classes_))
-            }
-            results.append({
+        best = probs.argmax(axis=1)
+        return X, probs, best
+
+    def predict_arrays(self, texts):
+        _, probs, best = self._scores(texts)
+        labels = self._class_names[best]
+        confidences = probs[np.arange(probs.shape[0]), best]
+        return labels, confidences, probs
+
+    def top_tokens(self, X, classes, n_tokens=3):
+        # Contribution of each token present in a row to the predicted class
+        # score: tfidf value * class coefficient, over the row's non-zeros only
+        X = X.tocsr()
+        indptr, indices, data = X.indptr, X.indices, X.data
+        explanations = []
+        for i, cls in enumerate(classes):
+            start, end = indptr[i], indptr[i + 1]
+            if start == end:
+                explanations.append([])
+                continue
+            cols = indices[start:end]
+            contrib = data[start:end] * self._class_coef[cls, cols]
+            positive = contrib > 0
+            if not positive.any():
+                explanations.append([])
+                continue
+            cols, contrib = cols[positive], contrib[positive]
+            total = contrib.sum()
+            order = np.argsort(-contrib)[:n_tokens]
+            explanations.append([
+                {"token": str(self._vocab[cols[j]]), "score": round(float(contrib[j] / total), 4)}
+                for j in order
+            ])
+        return explanations
+
+    def predict(self, texts, top_k=None, explain=False, n_tokens=3):
+        X, probs, best = self._scores(texts)
+        labels = self._class_names[best].tolist()
+        confidences = probs[np.arange(probs.shape[0]), best]
+        confidences = confidences.tolist()
+        names = self._class_list
+
+        if top_k is not None and top_k < len(names):
+            k = max(1, top_k)
+            top_idx = np.argsort(-probs, axis=1)[:, :k]
+            top_probs = np.take_along_axis(probs, top_idx, axis=1).tolist()
+            top_idx = top_idx.tolist()
+            probs_maps = [
+                {names[j]: p for j, p in zip(idx_row, prob_row)}
+                for idx_row, prob_row in zip(top_idx, top_probs)
+            ]
+        else:
+            probs_maps = [dict(zip(names, row)) for row in probs.tolist()]
+
+        tokens = self.top_tokens(X, best, n_tokens) if explain else [[] for _ in labels]
+
+        return [
+            {
                 "label": label,
-                "confidence": prob,
+                "confidence": confidence,
                 "probs": probs_map,
-                "top_tokens": []
-            })
-        return results
+                "top_tokens": row_tokens
+            }
+            for label, confidence, probs_map, row_tokens in zip(labels, confidences, probs_maps, tokens)
+        ]
+
+    def _grow_classes(self, labels):
+        # SGDClassifier cannot add classes on its own: append the new labels to
+        # the label index and give each a zero coefficient row, with the lowest
+        # existing intercept so it starts out unlikely rather than at 0.5
+        known = set(self._label_index)
+        new = sorted({label for label in labels if label not in known})
+        if not new:
+            return []
+
+        coef = np.asarray(self.clf.coef_)
+        intercept = np.asarray(self.clf.intercept_)
+        if coef.shape[0] == 1:
+            # Binary models keep one row for class 1; expand to one-vs-rest
+            coef = np.vstack([-coef[0], coef[0]])
+            intercept = np.array([-intercept[0], intercept[0]])
+        coef = np.vstack([coef, np.zeros((len(new), coef.shape[1]), dtype=coef.dtype)])
+        intercept = np.concatenate([intercept, np.full(len(new), intercept.min(), dtype=intercept.dtype)])
+
+        self._set_labels(self._labels.tolist() + new)
+        self.clf.classes_ = np.arange(len(self._labels))
+        self.clf.coef_ = np.ascontiguousarray(coef)
+        self.clf.intercept_ = intercept
+        return new
+
+    def partial_fit(self, texts, labels, batch_size=256, epochs=1, progress=None, sample_weight=None):
+        texts, labels = list(texts), list(labels)
+        if not texts:
+            return 0
+        if len(texts) != len(labels):
+            raise ValueError(f"Got {len(texts)} texts but {len(labels)} labels")
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight, dtype=float)
+            if len(sample_weight) != len(texts):
+                raise ValueError(f"Got {len(texts)} texts but {len(sample_weight)} sample weights")
+        if not self._is_fitted:
+            raise ValueError("Model not fitted or loaded.")
+
+        new_classes = self._grow_classes(labels)
+        if new_classes:
+            print("Added categories:", new_classes)
+        if self.incremental:
+            self.vectorizer.partial_fit(texts)
 
-    def partial_fit(self, texts, labels):
         X = self.vectorizer.transform(texts)
-    
-    
-        existing_labels = [label for label in labels if label in self.le.classes_]
-        if not existing_labels:
-            return 0  
-
-        y = self.le.transform(existing_labels)
-    
-    
-        self.clf.partial_fit(X[:len(y)], y)
-        self._is_fitted = True
+        y = self._encode(labels)
+        batch_size = max(1, batch_size)
+        epochs = max(1, epochs)
+        steps = epochs * ((len(y) + batch_size - 1) // batch_size)
+        done = 0
+        for _ in range(epochs):
+            for start in range(0, len(y), batch_size):
+                weights = None if sample_weight is None else sample_weight[start:start + batch_size]
+                self.clf.partial_fit(X[start:start + batch_size], y[start:start + batch_size], sample_weight=weights)
+                done += 1
+                # Called after every step; raising from it stops training
+                if progress is not None:
+                    progress(done / steps)
+        self._refresh_class_names()
         return len(y)
 
-
     def save(self, out_dir):
         os.makedirs(out_dir, exist_ok=True)
         joblib.dump(self.vectorizer, f"{out_dir}/vectorizer.pkl")
         joblib.dump(self.clf, f"{out_dir}/model.pkl")
         joblib.dump(self.le, f"{out_dir}/label_encoder.pkl")
+        with open(f"{out_dir}/meta.json", "w") as f:
+            json.dump({
+                "vectorizer": "hashing" if self.incremental else "tfidf",
+                "feedback_watermark": int(self.feedback_watermark),
+                "labels": self._labels.tolist()
+            }, f)
 
-    def load(self, out_dir):
+    def load(self, out_dir, version=None):
+        # out_dir may be a model registry root (loads its current version, or
+        # `version`) or a plain directory holding the three pickles
+        from ml.model_registry import ModelRegistry
+        out_dir, self.version = ModelRegistry(out_dir).resolve(version)
         self.vectorizer = joblib.load(f"{out_dir}/vectorizer.pkl")
         self.clf = joblib.load(f"{out_dir}/model.pkl")
         self.le = joblib.load(f"{out_dir}/label_encoder.pkl")
+        meta = {}
+        meta_path = f"{out_dir}/meta.json"
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        self.feedback_watermark = meta.get("feedback_watermark", 0)
+        # Older saves grew the encoder's classes_ in place, so it is already in
+        # encoded order there
+        self._set_labels(meta.get("labels", self.le.classes_))
         self._is_fitted = True
+        self._refresh_class_names()
@@ -1,22 +1,25 @@
-import pandas as pd
 import argparse
-from ml.data_pipeline import normalize_series
+from ml.corpus_cache import load_normalized_corpus, DEFAULT_CACHE_DIR
 from ml.tfidf_pipeline import TfidfPipeline
+from ml.model_registry import ModelRegistry
 
-def main(train_csv="data/GHCI_clean.csv", out="saved_models/tfidf"):
-    df = pd.read_csv(train_csv)
-    texts = normalize_series(df["transaction_text"]).tolist()
-    labels = df["category"].tolist()
+def main(train_csv="data/GHCI_clean.csv", out="saved_models/tfidf", hashing=False, cache_dir=DEFAULT_CACHE_DIR):
+    texts, labels, corpus = load_normalized_corpus(train_csv, cache_dir)
+    print(f"Corpus: {corpus['rows']} rows in {corpus['seconds']}s (cache {corpus['cache']})")
 
-    p = TfidfPipeline(max_features=5000)
+    p = TfidfPipeline(max_features=5000, hashing=hashing)
     p.fit(texts, labels)
-    p.save(out)
+    version = ModelRegistry(out).publish(p, metadata={"mode": "full", "train_csv": train_csv, "samples_used": len(texts)})
 
-    print("Model saved to:", out)
+    print("Model saved to:", out, "as version", version)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--train", default="data/GHCI_clean.csv")
     parser.add_argument("--out", default="saved_models/tfidf")
+    parser.add_argument("--hashing", action="store_true",
+                        help="Hashed features with running IDF, so the model can be updated incrementally")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Where the normalized corpus is cached, keyed by file hash and alias map version")
     args = parser.parse_args()
-    main(args.train, args.out)
+    main(args.train, args.out, args.hashing, args.cache_dir)
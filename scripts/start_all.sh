@@ -26,8 +26,15 @@ cleanup() {
 trap cleanup SIGINT SIGTERM
 
 # Start backend
+# Production mode (default): pre-fork server, models loaded once and shared by
+# all workers. Set CALCBERT_DEV=1 for the single-process auto-reload server.
+# CALCBERT_WORKERS overrides the worker count (0 = one per CPU core).
 echo -e "${BLUE}Starting Backend (FastAPI)...${NC}"
-(cd "$(dirname "$0")/.." && python -m uvicorn backend.app:app --host 127.0.0.1 --port 8000 --reload) &
+if [ "${CALCBERT_DEV:-0}" = "1" ]; then
+    (cd "$(dirname "$0")/.." && python -m uvicorn backend.app:app --host 127.0.0.1 --port 8000 --reload) &
+else
+    (cd "$(dirname "$0")/.." && python -m backend.serve --host 127.0.0.1 --port 8000 --workers "${CALCBERT_WORKERS:-0}") &
+fi
 BACKEND_PID=$!
 echo -e "${GREEN}✓ Backend started (PID: $BACKEND_PID)${NC}"
 echo "  API: http://127.0.0.1:8000"
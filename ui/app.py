@@ -42,19 +42,19 @@ def fetch_categories():
            
             pipeline = TfidfPipeline()
             pipeline.load("saved_models/tfidf")
-            return list(pipeline.le.classes_)
+            return list(pipeline.classes)
     except Exception as e:
         
         try:
             pipeline = TfidfPipeline()
             pipeline.load("saved_models/tfidf")
-            return list(pipeline.le.classes_)
+            return list(pipeline.classes)
         except:
             
             return []
 
 def call_predict(text: str):
-    payload = {"text": text, "meta": {}}
+    payload = {"text": text, "meta": {}, "explain": True}
     r = requests.post(f"{BACKEND_URL}/predict", json=payload, timeout=10.0)
     r.raise_for_status()
     return r.json()
@@ -65,11 +65,25 @@ def call_feedback(text: str, correct_label: str, user_id: str = "ui_user"):
     r.raise_for_status()
     return r.json()
 
-def call_retrain(mode="incremental", model="tfidf"):
+def call_retrain(mode="incremental", model="tfidf", poll_interval=1.0, max_wait=600.0):
     payload = {"mode": mode, "model": model}
     r = requests.post(f"{BACKEND_URL}/retrain", json=payload, timeout=30.0)
     r.raise_for_status()
-    return r.json()
+    result = r.json()
+    job_id = result.get("job_id")
+    if not job_id or result.get("status") not in ("started", "running"):
+        return result
+
+    # Retrains run as background jobs; poll until this one finishes
+    deadline = time.time() + max_wait
+    while time.time() < deadline:
+        time.sleep(poll_interval)
+        job = requests.get(f"{BACKEND_URL}/retrain/{job_id}", timeout=5.0)
+        job.raise_for_status()
+        job = job.json()
+        if job["status"] in ("complete", "error", "cancelled"):
+            return {**job.get("metrics", {}), "status": job["status"], "details": job["details"], "job_id": job_id}
+    return {"status": "running", "details": f"Retrain job {job_id} is still running", "job_id": job_id}
 
 
 if "session_transactions" not in st.session_state:
@@ -154,7 +168,10 @@ with left:
             if submit_btn:
                 try:
                     fb = call_feedback(st.session_state.last_predicted, correct_label)
-                    st.success(f"Saved feedback id: {fb.get('id', 'unknown')}")
+                    if fb.get("status") == "queued":
+                        st.success("Feedback received and queued for saving")
+                    else:
+                        st.success(f"Saved feedback id: {fb.get('id', 'unknown')}")
                 except Exception as e:
                     st.error(f"Feedback failed: {e}")
 